@@ -0,0 +1,142 @@
+"""
+Image converter benchmark on a synthetic book of page images
+
+Usage: python bench/benchmark_converter.py [--pages 200] [--workers 4] [--width 1200] [--height 1700] [--steps png,jpeg]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from modules.image_converter import ImageConverter
+
+
+def make_page(page, width, height):
+    """Draw a page of text-like lines whose layout is seeded by the page number"""
+    rng = random.Random(page)
+    img = Image.new('RGB', (width, height), (250, 248, 240))
+    draw = ImageDraw.Draw(img)
+    margin = width // 10
+    y = margin
+    while y < height - margin:
+        x = margin
+        while x < width - margin:
+            word = rng.randint(width // 60, width // 12)
+            draw.rectangle([x, y, min(x + word, width - margin), y + height // 120], fill=(30, 30, 30))
+            x += word + width // 80
+        y += height // 40
+    return img
+
+
+def make_corpus(directory, pages, width, height):
+    """Write a synthetic book: mostly JPEGs misnamed as .png, some .jpg and some genuine PNG pages"""
+    for page in range(pages):
+        img = make_page(page, width, height)
+        if page % 10 == 3:
+            img.save(os.path.join(directory, f"{page}.jpg"), 'JPEG', quality=90)
+        elif page % 5 == 0:
+            img.save(os.path.join(directory, f"{page}.png"), 'PNG')
+        else:
+            img.save(os.path.join(directory, f"{page}.png"), 'JPEG', quality=90)
+
+
+def digest_directory(directory):
+    """Return {file name: content digest} for every PNG in a directory"""
+    digests = {}
+    for file_name in os.listdir(directory):
+        if file_name.endswith('.png'):
+            with open(os.path.join(directory, file_name), 'rb') as f:
+                digests[file_name] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return digests
+
+
+def run_png(corpus, workers):
+    """Convert a fresh copy of the corpus to PNG, then again; return (seconds, converted, digests, rerun seconds)"""
+    with tempfile.TemporaryDirectory() as work:
+        directory = os.path.join(work, 'pages')
+        shutil.copytree(corpus, directory)
+        converter = ImageConverter(workers=workers)
+        started = time.perf_counter()
+        file_count, converted, misnamed, skipped = converter.convert_to_png(directory)
+        elapsed = time.perf_counter() - started
+
+        # A second run over the finished book should skip every page
+        started = time.perf_counter()
+        converter.convert_to_png(directory)
+        rerun = time.perf_counter() - started
+        return elapsed, converted, digest_directory(directory), rerun
+
+
+def run_jpeg(corpus, workers):
+    """Convert a PNG copy of the corpus to JPEG; return (seconds, converted, digests, progress updates)"""
+    with tempfile.TemporaryDirectory() as work:
+        directory = os.path.join(work, 'pages')
+        output = os.path.join(work, 'jpeg')
+        shutil.copytree(corpus, directory)
+        converter = ImageConverter(workers=workers)
+        converter.use_build_cache = False
+        converter.convert_to_png(directory)
+
+        updates = [0]
+
+        def callback(message, current=None, total=None):
+            updates[0] += 1
+
+        started = time.perf_counter()
+        converted = converter.convert_png_to_jpeg(directory, output, True, callback)
+        elapsed = time.perf_counter() - started
+
+        digests = {}
+        for file_name in os.listdir(output):
+            with open(os.path.join(output, file_name), 'rb') as f:
+                digests[file_name] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        return elapsed, converted, digests, updates[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image conversion with 1..N worker processes")
+    parser.add_argument('--pages', type=int, default=200, help="pages in the synthetic book")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="highest worker count to try")
+    parser.add_argument('--width', type=int, default=1200, help="page width in pixels")
+    parser.add_argument('--height', type=int, default=1700, help="page height in pixels")
+    parser.add_argument('--steps', default='png,jpeg', help="comma-separated converter steps to time")
+    args = parser.parse_args()
+    steps = args.steps.split(',')
+
+    print(f"Synthetic book: {args.pages} pages of {args.width}x{args.height}, {os.cpu_count()} cores")
+    with tempfile.TemporaryDirectory() as corpus:
+        make_corpus(corpus, args.pages, args.width, args.height)
+
+        print(f"{'step':<8} {'workers':>7} {'files':>6} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'identical':>9} "
+              f"{'extra':>8}")
+        for step in steps:
+            baseline = None
+            reference = None
+            for workers in range(1, max(1, args.workers) + 1):
+                # extra: rerun seconds for png, coalesced progress updates for jpeg
+                if step == 'png':
+                    elapsed, converted, digests, extra = run_png(corpus, workers)
+                    extra = f"{extra:.2f}"
+                else:
+                    elapsed, converted, digests, extra = run_jpeg(corpus, workers)
+                if baseline is None:
+                    baseline, reference = elapsed, digests
+                rate = converted / elapsed if elapsed else 0.0
+                speedup = baseline / elapsed if elapsed else 0.0
+                identical = 'yes' if digests == reference else 'NO'
+                print(f"{step:<8} {workers:>7} {converted:>6} {elapsed:>8.2f} {rate:>8.1f} {speedup:>7.2f}x "
+                      f"{identical:>9} {extra:>8}")
+
+
+if __name__ == '__main__':
+    main()
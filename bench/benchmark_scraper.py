@@ -0,0 +1,89 @@
+"""
+Offline scraper benchmark against the fake WebDriver and synthetic reader
+
+Usage: python bench/benchmark_scraper.py [--pages 200] [--window 8] [--latency 0.05]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.scraper import GoogleBooksScraper
+from bench.fake_driver import FakeDriver, SyntheticBook
+from modules.network_capture import NetworkCapture
+
+MODES = [
+    {'harvest_mode': 'element', 'discovery_mode': 'poll', 'download_mode': 'browser'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'poll', 'download_mode': 'browser'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'poll', 'download_mode': 'bytes'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'observe', 'download_mode': 'browser'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'observe', 'download_mode': 'bytes'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'observe', 'download_mode': 'bytes', 'naming_mode': 'page'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'poll', 'download_mode': 'bytes', 'capture_mode': 'network'},
+    {'harvest_mode': 'bulk', 'discovery_mode': 'observe', 'download_mode': 'bytes', 'use_rate_governor': True},
+]
+
+
+def run_mode(mode, pages, window, latency, timeout):
+    """Crawl a synthetic book with one mode and return (seconds, pages, driver calls)"""
+    with tempfile.TemporaryDirectory() as download_path:
+        scraper = GoogleBooksScraper(download_path, use_profile=False)
+        scraper.use_rate_governor = False  # Measure raw mode speed unless a mode enables it
+        for name, value in mode.items():
+            setattr(scraper, name, value)
+        scraper.use_manifest = False
+        scraper.observe_timeout = 0.5
+        scraper.driver = FakeDriver(SyntheticBook(pages, window, latency), download_path)
+        if mode.get('capture_mode') == 'network':
+            scraper.network_capture = NetworkCapture(scraper.driver)
+            scraper.network_capture.enable()
+
+        downloaded = [0]
+
+        def callback(new_images):
+            downloaded[0] += len(new_images)
+            if downloaded[0] >= pages:
+                scraper.stop_scraping()
+
+        thread = threading.Thread(target=scraper.start_scraping, args=(callback,))
+        thread.daemon = True
+        started = time.perf_counter()
+        thread.start()
+        thread.join(timeout)
+        scraper.stop_scraping()
+        elapsed = time.perf_counter() - started
+        thread.join()
+
+        return elapsed, downloaded[0], scraper.driver.calls, scraper.metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraping modes offline")
+    parser.add_argument('--pages', type=int, default=200, help="pages in the synthetic book")
+    parser.add_argument('--window', type=int, default=8, help="pages kept in the virtual scroll list")
+    parser.add_argument('--latency', type=float, default=0.05, help="render latency per page in seconds")
+    parser.add_argument('--timeout', type=float, default=120, help="max seconds per mode")
+    parser.add_argument('--stages', action='store_true', help="print per-stage timing summaries")
+    args = parser.parse_args()
+
+    print(f"Synthetic book: {args.pages} pages, window {args.window}, render latency {args.latency}s")
+    print(f"{'harvest':<8} {'discovery':<9} {'download':<8} {'capture':<8} {'naming':<9} {'governor':<8} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'calls/page':>10}")
+    for mode in MODES:
+        elapsed, pages, calls, metrics = run_mode(mode, args.pages, args.window, args.latency, args.timeout)
+        rate = pages / elapsed if elapsed else 0.0
+        per_page = calls / pages if pages else 0.0
+        print(f"{mode['harvest_mode']:<8} {mode['discovery_mode']:<9} {mode['download_mode']:<8} "
+              f"{mode.get('capture_mode', 'dom'):<8} {mode.get('naming_mode', 'discovery'):<9} "
+              f"{'on' if mode.get('use_rate_governor') else 'off':<8} {pages:>6} {elapsed:>8.2f} {rate:>8.1f} {per_page:>10.1f}")
+        if args.stages:
+            print(metrics.format_summary())
+
+
+if __name__ == '__main__':
+    main()
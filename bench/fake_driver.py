@@ -0,0 +1,398 @@
+"""
+In-process fake WebDriver serving a synthetic Google Play Books reader
+
+Implements the subset of the WebDriver API that GoogleBooksScraper uses so the
+scraping loop can be benchmarked offline, without Chrome or a Google login.
+"""
+
+import base64
+import json
+import os
+import re
+import struct
+import time
+import zlib
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from modules import scraper
+
+
+def make_page_png(page):
+    """Return a small valid PNG whose pixels encode the page number"""
+    width, height = 16, 16
+    shade = page % 256
+    row = b'\x00' + bytes([shade, (page >> 8) % 256, 255 - shade]) * width
+    raw = row * height
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+
+class SyntheticBook:
+    def __init__(self, page_count=100, window=8, render_latency=0.05, session='fake'):
+        self.page_count = page_count
+        self.window = window  # Pages kept in the virtual scroll list at once
+        self.render_latency = render_latency  # Seconds before a page in view gets its img src
+        self.session = session
+        self.top = 0
+        self.entered_at = {}
+        self.delivered = set()  # Pages already handed to the observer queue
+        self.generation = {}  # page -> times the page was re-rendered under a new blob URL
+        self.content = {}  # page -> page whose image it shows, e.g. repeated blank pages
+        self.page_height = 1000  # Pixels per page item
+        self.margin = 40  # Pixels between page items
+        self.heights = {}  # page -> height of pages taller than page_height, e.g. fold-outs
+        self.touch_window()
+
+    def visible_pages(self):
+        """Return the pages currently in the virtual scroll list"""
+        return list(range(self.top, min(self.top + self.window, self.page_count)))
+
+    def touch_window(self):
+        """Start the render clock for pages that just entered the list"""
+        now = time.monotonic()
+        for page in self.visible_pages():
+            self.entered_at.setdefault(page, now)
+
+    def scroll_to(self, page):
+        """Move the top of the list to a page offset"""
+        self.top = max(0, min(page, max(0, self.page_count - self.window)))
+        self.touch_window()
+
+    def offset(self, page):
+        """Return the pixel offset of a page's top in the scroll content"""
+        return sum(self.heights.get(other, self.page_height) + self.margin for other in range(page))
+
+    def scroll_to_offset(self, offset):
+        """Scroll the content so the page at a pixel offset is at the top"""
+        page = 0
+        while page + 1 < self.page_count and self.offset(page + 1) <= offset:
+            page += 1
+        self.scroll_to(page)
+
+    def seek(self, page):
+        """Emulate SEEK_SCRIPT: measure the pitch and anchor at the top item, then scroll"""
+        first = self.visible_pages()[0]
+        pitch = self.offset(first + 1) - self.offset(first)
+        offset = self.offset(first) + pitch * (page - first)
+        self.scroll_to_offset(offset)
+        return offset
+
+    def src(self, page):
+        """Return the img src of a page, or None while it is still rendering"""
+        entered = self.entered_at.get(page)
+        if entered is None or time.monotonic() - entered < self.render_latency:
+            return None
+        generation = self.generation.get(page)
+        if generation:
+            return f"blob:https://play.google.com/{self.session}-r{generation}-{page}"
+        return f"blob:https://play.google.com/{self.session}-{page}"
+
+    def rerender(self, page):
+        """Give a page a new blob URL, as the reader does when it renders the page again"""
+        self.generation[page] = self.generation.get(page, 0) + 1
+        self.delivered.discard(page)
+
+    def image(self, page):
+        """Return the PNG bytes shown on a page"""
+        return make_page_png(self.content.get(page, page))
+
+    def page_for_src(self, src):
+        """Map a blob URL back to its page number"""
+        match = re.search(r'-(\d+)$', src)
+        return int(match.group(1)) if match else None
+
+    def rendered(self):
+        """Return (position, src, page) for every rendered page in the list"""
+        pages = []
+        for position, page in enumerate(self.visible_pages()):
+            src = self.src(page)
+            if src:
+                pages.append((position, src, page))
+        return pages
+
+    def next_render_delay(self):
+        """Return seconds until the next visible page finishes rendering, or None"""
+        now = time.monotonic()
+        delays = [self.entered_at[page] + self.render_latency - now
+                  for page in self.visible_pages() if page not in self.delivered]
+        return max(0.0, min(delays)) if delays else None
+
+
+class FakeElement:
+    def __init__(self, driver, kind, page=None, position=None):
+        self.driver = driver
+        self.kind = kind
+        self.page = page
+        self.position = position
+
+    def find_element(self, by, value):
+        self.driver.calls += 1
+        if by != By.TAG_NAME:
+            raise NoSuchElementException(f"{by}={value}")
+        book = self.driver.book
+        if self.kind == 'wrapper' and value == 'ol':
+            return FakeElement(self.driver, 'ol')
+        if self.kind == 'li' and value == 'reader-rendered-page':
+            return FakeElement(self.driver, 'render', self.page, self.position)
+        if self.kind == 'render' and value == 'img' and book.src(self.page):
+            return FakeElement(self.driver, 'img', self.page, self.position)
+        raise NoSuchElementException(f"{self.kind} has no {value}")
+
+    def find_elements(self, by, value):
+        self.driver.calls += 1
+        if self.kind == 'ol' and by == By.TAG_NAME and value == 'li':
+            return [FakeElement(self.driver, 'li', page, position)
+                    for position, page in enumerate(self.driver.book.visible_pages())]
+        return []
+
+    def get_attribute(self, name):
+        self.driver.calls += 1
+        if name != 'src':
+            return None
+        if self.page not in self.driver.book.visible_pages():
+            raise StaleElementReferenceException("element is no longer attached")
+        return self.driver.book.src(self.page)
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.calls += 1
+        self.driver.in_frame = False
+
+    def frame(self, frame):
+        self.driver.calls += 1
+        self.driver.in_frame = True
+
+    def default_content(self):
+        self.driver.calls += 1
+        self.driver.in_frame = False
+
+
+class FakeDriver:
+    def __init__(self, book=None, download_path=None):
+        self.book = book or SyntheticBook()
+        self.download_path = download_path
+        self.switch_to = FakeSwitchTo(self)
+        self.in_frame = False
+        self.observer_installed = False
+        self.current_url = 'https://play.google.com/books/reader?id=fake'
+        self.calls = 0
+        self.script_timeout = 30
+        self.network_enabled = False
+        self.logged_pages = set()  # Pages whose image response was already reported
+        self.helper_installed = False
+        self.helper_seen = set()
+        self.broken_pages = set()  # Pages whose bytes fetch fails
+        self.cached_pages = set()  # Pages served from Chrome's cache, reported with no encoded length
+
+    @property
+    def window_handles(self):
+        self.calls += 1
+        return ['main']
+
+    def get(self, url):
+        self.calls += 1
+        self.current_url = url
+
+    def find_element(self, by, value):
+        self.calls += 1
+        if not self.in_frame and by == By.CSS_SELECTOR and value == 'iframe.-gb-display':
+            return FakeElement(self, 'iframe')
+        if self.in_frame and by == By.CLASS_NAME and value == 'cdk-virtual-scroll-content-wrapper':
+            return FakeElement(self, 'wrapper')
+        raise NoSuchElementException(f"{by}={value}")
+
+    def find_elements(self, by, value):
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
+
+    def set_script_timeout(self, seconds):
+        self.calls += 1
+        self.script_timeout = seconds
+
+    def execute_cdp_cmd(self, command, params):
+        self.calls += 1
+        if command == 'Page.setDownloadBehavior':
+            self.download_path = params.get('downloadPath')
+        elif command == 'Network.enable':
+            self.network_enabled = True
+        elif command == 'Network.getResponseBody':
+            page = int(params['requestId'].split('.')[-1])
+            return {'body': base64.b64encode(self.book.image(page)).decode('ascii'), 'base64Encoded': True}
+        return {}
+
+    def get_log(self, log_type):
+        """Return performance log entries for page image responses that finished since the last call"""
+        self.calls += 1
+        if log_type != 'performance' or not self.network_enabled:
+            return []
+        entries = []
+        responses = []
+        # Responses finish out of order, and the reader also loads images that are not pages
+        for position, src, page in reversed(self.book.rendered()):
+            if page in self.logged_pages:
+                continue
+            self.logged_pages.add(page)
+            responses.append((f"fake.{page}", f"https://books.googleusercontent.com/books/content?id=fake&pg=PT{page + 1}&img=1",
+                              page in self.cached_pages))
+            if page == 0:
+                responses.append(('fake.cover', 'https://books.google.com/books/content?id=fake&printsec=frontcover&img=1',
+                                  False))
+        for request_id, url, cached in responses:
+            events = [
+                {'method': 'Network.responseReceived',
+                 'params': {'requestId': request_id, 'response': {'url': url, 'mimeType': 'image/png'}}},
+                {'method': 'Network.loadingFinished',
+                 'params': {'requestId': request_id, 'encodedDataLength': 0 if cached else 4096}},
+            ]
+            entries.extend({'message': json.dumps({'message': event})} for event in events)
+        return entries
+
+    def save_download(self, src, file_name):
+        """Write a page the way Chrome's download manager would"""
+        page = self.book.page_for_src(src)
+        if page is None or not self.download_path:
+            return
+        # Chrome never overwrites: an existing N.png makes it save N (1).png, N (2).png, ...
+        stem, extension = os.path.splitext(file_name)
+        path = os.path.join(self.download_path, file_name)
+        copy = 0
+        while os.path.exists(path):
+            copy += 1
+            path = os.path.join(self.download_path, f"{stem} ({copy}){extension}")
+        with open(path, 'wb') as f:
+            f.write(self.book.image(page))
+
+    def scroll_past_list(self):
+        """Emulate scrollIntoView() on the last item of the list"""
+        visible = self.book.visible_pages()
+        if visible:
+            self.book.scroll_to(visible[-1])
+
+    def scroll_ahead(self, pages):
+        """Emulate SCROLL_AHEAD_SCRIPT: stop at the first page that is still rendering"""
+        visible = self.book.visible_pages()
+        if not visible:
+            return None
+        target = len(visible) - 1
+        last_rendered = -1
+        for position, page in enumerate(visible):
+            if self.book.src(page):
+                last_rendered = position
+            else:
+                target = position
+                break
+        target = max(0, min(target, last_rendered + pages))
+        self.book.scroll_to(visible[target])
+        return target
+
+    def call_helper(self, name, args):
+        """Emulate the functions of PAGE_HELPER_SCRIPT"""
+        book = self.book
+        if name in ('harvest', 'collectNewSrcs'):
+            if not self.in_frame:
+                return None
+            pages = [list(page) for page in book.rendered()]
+            if name == 'collectNewSrcs':
+                pages = [page for page in pages if page[1] not in self.helper_seen]
+                self.helper_seen.update(page[1] for page in pages)
+            if args and args[0]:
+                self.scroll_past_list()
+            return pages
+        if name == 'resetSeen':
+            self.helper_seen.clear()
+            return True
+        if name == 'scrollAhead':
+            return self.scroll_ahead(args[0])
+        if name == 'seek':
+            return book.seek(args[0])
+        if name == 'downloadMany':
+            for src, file_name in args[0]:
+                self.save_download(src, file_name)
+            return len(args[0])
+        return None
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        book = self.book
+        if script.startswith('return window.__gbc ?'):
+            if not self.helper_installed:
+                return scraper.HELPER_MISSING
+            name = re.search(r'window\.__gbc\.(\w+)\.apply', script).group(1)
+            return self.call_helper(name, args)
+        if script == scraper.PAGE_HELPER_SCRIPT:
+            self.helper_installed = True
+            return None
+        if script == scraper.HARVEST_SCRIPT:
+            if not self.in_frame:
+                return None
+            pages = [list(page) for page in book.rendered()]
+            if args and args[0]:
+                self.scroll_past_list()
+            return pages
+        if script == scraper.PAGE_IDS_SCRIPT:
+            return [element.page for element in args[0]]
+        if script == scraper.OBSERVER_INSTALL_SCRIPT:
+            self.observer_installed = self.in_frame
+            return self.in_frame
+        if script == scraper.SCROLL_AHEAD_SCRIPT:
+            return self.scroll_ahead(args[0])
+        if script == scraper.SEEK_SCRIPT:
+            return book.seek(args[0])
+        if script == "arguments[0].scrollIntoView();":
+            book.scroll_to(args[0].page)
+            return None
+        if 'downloadBlob' in script:
+            src = re.search(r'var blobUrl = "([^"]*)"', script).group(1)
+            file_name = re.search(r"downloadBlob\(blobUrl, '([^']*)'\)", script).group(1)
+            self.save_download(src, file_name)
+            return None
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.calls += 1
+        book = self.book
+        if script == scraper.FETCH_BYTES_SCRIPT:
+            page = book.page_for_src(args[0])
+            if page is None or page in self.broken_pages:
+                return {'error': 'unknown blob'}
+            return {'data': base64.b64encode(book.image(page)).decode('ascii')}
+        if script == scraper.FETCH_MANY_SCRIPT:
+            results = []
+            for src in args[0]:
+                page = book.page_for_src(src)
+                if page is None or page in self.broken_pages:
+                    results.append({'error': 'unknown blob'})
+                else:
+                    results.append({'data': base64.b64encode(book.image(page)).decode('ascii')})
+            return results
+        if script == scraper.OBSERVER_DRAIN_SCRIPT:
+            if not self.observer_installed:
+                return None
+            deadline = time.monotonic() + args[0] / 1000.0
+            while True:
+                pages = [list(page) for page in book.rendered() if page[2] not in book.delivered]
+                if pages or time.monotonic() >= deadline:
+                    break
+                delay = book.next_render_delay()
+                time.sleep(min(delay if delay is not None else 0.05, max(0.0, deadline - time.monotonic())) or 0.001)
+            for page in pages:
+                book.delivered.add(page[2])
+            return pages
+        return None
+
+    def quit(self):
+        self.calls += 1
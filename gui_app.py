@@ -180,6 +180,13 @@ class GoogleBooksCrawlerGUI:
         png_frame = ttk.LabelFrame(tab, text="Convert to PNG", padding="10")
         png_frame.pack(fill="x", padx=10, pady=5)
 
+        workers_frame = ttk.Frame(png_frame)
+        workers_frame.pack(pady=5)
+        ttk.Label(workers_frame, text="Worker processes (0 = all cores):").pack(side="left")
+        self.workers_var = tk.IntVar(value=self.settings.get_int('Converter', 'workers', 0))
+        self.workers_var.trace('w', lambda *args: self.settings.set('Converter', 'workers', self.workers_var.get()))
+        ttk.Spinbox(workers_frame, from_=0, to=64, textvariable=self.workers_var, width=5).pack(side="left", padx=5)
+
         ttk.Button(png_frame, text="Convert All to PNG", command=self.convert_to_png, width=30).pack(pady=5)
 
         # Convert to JPEG
@@ -198,6 +205,13 @@ class GoogleBooksCrawlerGUI:
 
         ttk.Button(jpeg_frame, text="Convert to JPEG", command=self.convert_to_jpeg, width=30).grid(row=2, column=0, columnspan=3, pady=5)
 
+        # Unchanged pages are skipped unless a full rebuild is forced
+        self.convert_force_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(tab, text="Force full rebuild (ignore the build cache)",
+                        variable=self.convert_force_var).pack(anchor="w", padx=10)
+
+        ttk.Button(tab, text="Cancel Conversion", command=self.converter.cancel, width=30).pack(pady=5)
+
         # Progress
         self.converter_progress = ttk.Progressbar(tab, maximum=100)
         self.converter_progress.pack(fill="x", padx=10, pady=5)
@@ -295,6 +309,10 @@ class GoogleBooksCrawlerGUI:
         ttk.Scale(options_frame, from_=1.0, to=2.0, variable=self.color_factor_var, orient="horizontal", length=200).grid(row=1, column=1, padx=5)
         ttk.Label(options_frame, textvariable=self.color_factor_var).grid(row=1, column=2)
 
+        self.pdf_force_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Force full rebuild (ignore the build cache)",
+                        variable=self.pdf_force_var).grid(row=2, column=0, columnspan=3, sticky="w")
+
         # Create PDF button
         ttk.Button(tab, text="Create PDF", command=self.create_pdf, width=30).pack(pady=10)
 
@@ -654,9 +672,16 @@ class GoogleBooksCrawlerGUI:
                 self.converter_progress['value'] = progress
                 self.root.update_idletasks()
 
+        try:
+            self.converter.workers = self.workers_var.get()
+        except tk.TclError:
+            self.converter.workers = 0
+
         def run_conversion():
-            file_count, converted, misnamed = self.converter.convert_to_png(directory, callback)
-            self.log_message(self.converter_log, f"\nConversion complete: {converted}/{file_count} files")
+            file_count, converted, misnamed, skipped = self.converter.convert_to_png(
+                directory, callback, force=self.convert_force_var.get())
+            self.log_message(self.converter_log, f"\nConversion complete: {converted}/{file_count} files converted, "
+                                                 f"{skipped} already PNG")
             if misnamed:
                 self.log_message(self.converter_log, f"Fixed {len(misnamed)} misnamed files")
 
@@ -678,6 +703,10 @@ class GoogleBooksCrawlerGUI:
             return
 
         self.converter_progress['value'] = 0
+        try:
+            self.converter.workers = self.workers_var.get()
+        except tk.TclError:
+            self.converter.workers = 0
 
         def callback(message, current=None, total=None):
             self.log_message(self.converter_log, message)
@@ -690,7 +719,8 @@ class GoogleBooksCrawlerGUI:
             processed = self.converter.convert_png_to_jpeg(
                 source, output,
                 self.apply_sharpness_var.get(),
-                callback
+                callback,
+                force=self.convert_force_var.get()
             )
             self.log_message(self.converter_log, f"\nConverted {processed} files to JPEG")
 
@@ -777,7 +807,8 @@ class GoogleBooksCrawlerGUI:
                 source, output,
                 self.enhance_color_var.get(),
                 self.color_factor_var.get(),
-                callback
+                callback,
+                force=self.pdf_force_var.get()
             )
             if success:
                 messagebox.showinfo("Complete", f"PDF created: {output}")
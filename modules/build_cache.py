@@ -0,0 +1,137 @@
+"""
+Incremental build cache for converter stages, stored beside the source images
+"""
+
+import hashlib
+import json
+import os
+
+
+class BuildCache:
+    FILE_NAME = '.convert_cache.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.stages = {}  # stage -> {input name: entry}
+        self.fingerprints = {}  # input name -> (size, mtime, hash) already computed in this run
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Read the cache file; a missing or unreadable file starts an empty cache"""
+        self.stages = {}
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.stages = data
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable build cache: {e}")
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        if not self.dirty:
+            return
+        temp_path = self.path + '.part'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stages, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error writing build cache: {e}")
+
+    @staticmethod
+    def file_hash(path):
+        """Return the content hash of a file"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def data_hash(data):
+        """Return the content hash of bytes already read, equal to file_hash of their file"""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    @staticmethod
+    def file_stat(path):
+        """Return (size, mtime in ns) of a file, or None if it is missing"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def remember(self, name, fingerprint):
+        """Keep an input's (size, mtime, hash) computed elsewhere, e.g. by a worker that read the file"""
+        if fingerprint is not None:
+            self.fingerprints[name] = tuple(fingerprint)
+
+    def input_hash(self, name, input_stat):
+        """Return the content hash of an input, reusing one computed in this run while its stat is unchanged"""
+        known = self.fingerprints.get(name)
+        if known is not None and known[:2] == tuple(input_stat):
+            return known[2]
+        value = self.file_hash(os.path.join(self.directory, name))
+        self.fingerprints[name] = tuple(input_stat) + (value,)
+        return value
+
+    def has_entry(self, stage, name):
+        """Check whether an input has been built before in a stage"""
+        return name in self.stages.get(stage, {})
+
+    def names(self, stage):
+        """Return the input names recorded for a stage"""
+        return set(self.stages.get(stage, {}))
+
+    def is_fresh(self, stage, name, params, output):
+        """Check whether an input was already built with these parameters into an unchanged output"""
+        entry = self.stages.get(stage, {}).get(name)
+        if entry is None or entry.get('params') != params or entry.get('output') != output:
+            return False
+
+        output_stat = self.file_stat(output)
+        if output_stat is None or list(output_stat) != entry.get('output_stat'):
+            return False
+
+        input_path = os.path.join(self.directory, name)
+        input_stat = self.file_stat(input_path)
+        if input_stat is None:
+            return False
+        if list(input_stat) == [entry.get('size'), entry.get('mtime')]:
+            self.fingerprints[name] = tuple(input_stat) + (entry.get('hash'),)
+            return True
+
+        # Touched but possibly unchanged: fall back to the content hash
+        if self.input_hash(name, input_stat) != entry.get('hash'):
+            return False
+        entry['size'], entry['mtime'] = input_stat
+        self.dirty = True
+        return True
+
+    def record(self, stage, name, params, output):
+        """Remember that an input was built into output with these parameters; known hashes are reused"""
+        input_path = os.path.join(self.directory, name)
+        input_stat = self.file_stat(input_path)
+        output_stat = self.file_stat(output)
+        if input_stat is None or output_stat is None:
+            return
+        self.stages.setdefault(stage, {})[name] = {
+            'size': input_stat[0],
+            'mtime': input_stat[1],
+            'hash': self.input_hash(name, input_stat),
+            'params': params,
+            'output': output,
+            'output_stat': list(output_stat)
+        }
+        self.dirty = True
+
+    def clear(self, stage):
+        """Forget every entry of a stage"""
+        if self.stages.pop(stage, None) is not None:
+            self.dirty = True
@@ -0,0 +1,70 @@
+"""
+Append-only JSONL record of pages crawled into a download directory
+"""
+
+import json
+import os
+import re
+
+
+class CrawlManifest:
+    FILE_NAME = 'manifest.jsonl'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILE_NAME)
+
+    def exists(self):
+        """Check whether a manifest has been written for this directory"""
+        return os.path.isfile(self.path)
+
+    @staticmethod
+    def book_id(url):
+        """Extract the book id from a reader URL, or None if it has none"""
+        match = re.search(r'[?&]id=([^&#]+)', url or '')
+        return match.group(1) if match else None
+
+    def load(self, book_id=None):
+        """Read the manifest and return {index: record}, later lines overriding earlier ones
+
+        With a book_id, records written for another book (or before book ids were recorded) are ignored.
+        """
+        records = {}
+        if not self.exists():
+            return records
+
+        ignored = 0
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    index = int(record['index'])
+                except (ValueError, KeyError, TypeError) as e:
+                    # A crash can leave a truncated last line; skip it
+                    print(f"Skipping bad manifest line {line_number}: {e}")
+                    continue
+                if book_id is not None and record.get('book') != book_id:
+                    ignored += 1
+                    continue
+                records[index] = record
+        if ignored:
+            print(f"Ignoring {ignored} manifest records that do not belong to book {book_id}")
+        return records
+
+    def append(self, index, digest, file_name, size, status, **fields):
+        """Append one page record; extra fields (e.g. content digest) are stored as given"""
+        record = {
+            'index': index,
+            'digest': digest,
+            'file': file_name,
+            'size': size,
+            'status': status
+        }
+        record.update(fields)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
@@ -0,0 +1,135 @@
+"""
+Lightweight per-cycle timing metrics for the scraping loop
+"""
+
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class CrawlMetrics:
+    def __init__(self, jsonl_path=None, max_cycles=10000):
+        self.jsonl_path = jsonl_path  # Optional file that every finished cycle is appended to
+        self.cycles = deque(maxlen=max_cycles)
+        self.cycle_count = 0  # Cycles begun, still counting once old records drop out of the deque
+        self.started = None
+        self.total_pages = 0
+        self.total_errors = 0
+        self.backoffs = {}  # reason -> rate governor back-offs
+        self.rate = None  # Last rate (pages/second) allowed by the rate governor
+        self._cycle = None
+
+    def begin_cycle(self):
+        """Start timing a new scraping cycle"""
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self.cycle_count += 1
+        self._cycle = {'cycle': self.cycle_count, 'time': time.time(), 'stages': {},
+                       'new_pages': 0, 'errors': 0}
+
+    def add(self, stage, seconds):
+        """Add time spent in a stage to the current cycle"""
+        if self._cycle is not None:
+            stages = self._cycle['stages']
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage):
+        """Time the enclosed block as a stage of the current cycle"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def error(self, count=1):
+        """Count errors in the current cycle"""
+        self.total_errors += count
+        if self._cycle is not None:
+            self._cycle['errors'] += count
+
+    def current_errors(self):
+        """Return the error count of the current cycle"""
+        return self._cycle['errors'] if self._cycle is not None else 0
+
+    def stage_seconds(self, stage):
+        """Return seconds spent in a stage during the current cycle"""
+        return self._cycle['stages'].get(stage, 0.0) if self._cycle is not None else 0.0
+
+    def end_cycle(self, new_pages=0, **extra):
+        """Finish the current cycle and keep (and optionally write) its record"""
+        cycle = self._cycle
+        if cycle is None:
+            return None
+        self._cycle = None
+        cycle['new_pages'] = new_pages
+        cycle.update(extra)
+        self.total_pages += new_pages
+        if cycle.get('rate') is not None:
+            self.rate = cycle['rate']
+        if cycle.get('backoff'):
+            self.backoffs[cycle['backoff']] = self.backoffs.get(cycle['backoff'], 0) + 1
+        self.cycles.append(cycle)
+
+        if self.jsonl_path:
+            try:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(cycle) + '\n')
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
+        return cycle
+
+    def dump_jsonl(self, path):
+        """Write every kept cycle record to a JSONL file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for cycle in self.cycles:
+                f.write(json.dumps(cycle) + '\n')
+
+    @staticmethod
+    def percentile(values, fraction):
+        """Return the nearest-rank percentile of a list of numbers"""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[rank]
+
+    def pages_per_minute(self):
+        """Return pages/minute since the first cycle"""
+        if self.started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started
+        return self.total_pages * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Return p50/p95 seconds per stage plus page, error and rate totals"""
+        per_stage = {}
+        for cycle in self.cycles:
+            for stage, seconds in cycle['stages'].items():
+                per_stage.setdefault(stage, []).append(seconds)
+
+        return {
+            'cycles': len(self.cycles),
+            'pages': self.total_pages,
+            'errors': self.total_errors,
+            'pages_per_minute': self.pages_per_minute(),
+            'rate': self.rate,
+            'backoffs': dict(self.backoffs),
+            'stages': {stage: {'p50': self.percentile(values, 0.5), 'p95': self.percentile(values, 0.95)}
+                       for stage, values in per_stage.items()}
+        }
+
+    def format_summary(self):
+        """Return the summary as printable text"""
+        summary = self.summary()
+        lines = [f"{summary['cycles']} cycles, {summary['pages']} pages, {summary['errors']} errors, "
+                 f"{summary['pages_per_minute']:.1f} pages/min"]
+        if summary['rate'] is not None:
+            backoffs = ', '.join(f"{reason} {count}" for reason, count in sorted(summary['backoffs'].items()))
+            lines.append(f"  governor rate {summary['rate'] * 60:.0f} pages/min, back-offs: {backoffs or 'none'}")
+        for stage, values in sorted(summary['stages'].items()):
+            lines.append(f"  {stage:<12} p50 {values['p50'] * 1000:8.1f} ms   p95 {values['p95'] * 1000:8.1f} ms")
+        return '\n'.join(lines)
@@ -0,0 +1,86 @@
+"""
+Download completion tracking for files written by Chrome's download manager
+"""
+
+import os
+import time
+
+
+class DownloadTracker:
+    def __init__(self, download_path, max_in_flight=8, stall_timeout=30.0, poll_interval=0.1, on_complete=None):
+        self.download_path = download_path
+        self.max_in_flight = max_in_flight
+        self.stall_timeout = stall_timeout  # Seconds before an unfinished download is given up
+        self.poll_interval = poll_interval
+        self.on_complete = on_complete  # Called with (file_name, latency) when a file lands
+
+        self.in_flight = {}  # file name -> start time
+        self.latencies = {}  # file name -> seconds until the file landed
+        self.stalled = []
+
+    def start(self, file_name):
+        """Record that a download for file_name was requested"""
+        self.in_flight[file_name] = time.monotonic()
+
+    def complete(self, file_name):
+        """Mark file_name as finished and record its latency"""
+        started = self.in_flight.pop(file_name, None)
+        if started is not None:
+            latency = time.monotonic() - started
+            self.latencies[file_name] = latency
+            if self.on_complete:
+                self.on_complete(file_name, latency)
+
+    def cancel(self, file_name):
+        """Stop tracking a download that failed before it was handed to Chrome"""
+        self.in_flight.pop(file_name, None)
+
+    def poll(self):
+        """Scan the download directory once and mark finished files; return in-flight count"""
+        if not self.in_flight:
+            return 0
+
+        finished = set()
+        try:
+            with os.scandir(self.download_path) as entries:
+                for entry in entries:
+                    if entry.name in self.in_flight and entry.is_file() and entry.stat().st_size > 0:
+                        finished.add(entry.name)
+        except OSError as e:
+            print(f"Error scanning download directory: {e}")
+
+        for file_name in finished:
+            self.complete(file_name)
+
+        now = time.monotonic()
+        for file_name, started in list(self.in_flight.items()):
+            if now - started > self.stall_timeout:
+                del self.in_flight[file_name]
+                self.stalled.append(file_name)
+                print(f"Download did not finish in time: {file_name}")
+
+        return len(self.in_flight)
+
+    def wait_for_slot(self, should_continue=None):
+        """Block until fewer than max_in_flight downloads are pending"""
+        while self.poll() >= self.max_in_flight:
+            if should_continue is not None and not should_continue():
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def wait_all(self, timeout=None):
+        """Block until every pending download has finished or stalled"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def get_latency_summary(self):
+        """Return (count, mean, max) completion latency in seconds"""
+        if not self.latencies:
+            return 0, 0.0, 0.0
+        values = list(self.latencies.values())
+        return len(values), sum(values) / len(values), max(values)
@@ -0,0 +1,166 @@
+"""
+Chrome driver factory with a cached patched chromedriver and a pool of pre-started drivers
+"""
+
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import undetected_chromedriver as uc
+
+
+def detect_chrome_version():
+    """Return the installed Chrome major version, or None if it cannot be found"""
+    version = None
+    if sys.platform.startswith('win'):
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Google\Chrome\BLBeacon') as key:
+                version = winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            version = None
+    else:
+        executable = uc.find_chrome_executable()
+        if executable:
+            try:
+                version = subprocess.run([executable, '--version'], capture_output=True,
+                                         text=True, timeout=10).stdout
+            except (OSError, subprocess.SubprocessError):
+                version = None
+
+    match = re.search(r'(\d+)\.\d+', version or '')
+    return int(match.group(1)) if match else None
+
+
+def clone_profile(source, target):
+    """Copy a Chrome profile directory, skipping the lock files of a running instance"""
+    if os.path.isdir(source):
+        shutil.copytree(source, target, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns('Singleton*', 'lockfile', '*.lock'))
+    else:
+        os.makedirs(target, exist_ok=True)
+    return target
+
+
+class DriverFactory:
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            self.cache_dir = os.path.join(os.getcwd(), 'driver_cache')
+        else:
+            self.cache_dir = cache_dir
+        self._chrome_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def chrome_version(self):
+        if self._chrome_version is None:
+            self._chrome_version = detect_chrome_version()
+        return self._chrome_version
+
+    def cached_driver_path(self, version):
+        """Return where the patched chromedriver for a Chrome version is cached"""
+        name = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+        return os.path.join(self.cache_dir, str(version or 'default'), name)
+
+    def create(self, options):
+        """Start Chrome, reusing the cached patched chromedriver when one exists"""
+        version = self.chrome_version
+        cached_path = self.cached_driver_path(version)
+
+        kwargs = {'options': options}
+        if version:
+            kwargs['version_main'] = version
+        if os.path.isfile(cached_path):
+            kwargs['driver_executable_path'] = cached_path
+
+        driver = uc.Chrome(**kwargs)
+
+        if 'driver_executable_path' not in kwargs:
+            with self._lock:
+                try:
+                    os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+                    shutil.copy2(driver.patcher.executable_path, cached_path)
+                except (OSError, AttributeError) as e:
+                    print(f"Could not cache patched chromedriver: {e}")
+        return driver
+
+
+class DriverPool:
+    def __init__(self, options_builder, size=1, profile_dir=None, factory=None):
+        # options_builder(profile_dir) must return a fresh ChromeOptions for each driver
+        self.options_builder = options_builder
+        self.size = size
+        self.profile_dir = profile_dir
+        self.factory = factory or DriverFactory()
+
+        self.ready = queue.Queue()
+        self.slots = {}  # id(driver) -> slot number
+        self.startup_seconds = []
+        self.is_closed = False
+
+    def slot_profile(self, slot):
+        """Return the profile directory for a slot; Chrome cannot share one between instances"""
+        if self.profile_dir is None:
+            return None
+        if slot == 0:
+            return self.profile_dir
+        return clone_profile(self.profile_dir, f"{self.profile_dir}_pool{slot}")
+
+    def start(self):
+        """Pre-start one driver per slot in the background"""
+        for slot in range(self.size):
+            self.spawn(slot)
+
+    def spawn(self, slot):
+        """Start a driver for a slot in a background thread"""
+        thread = threading.Thread(target=self._spawn, args=(slot,))
+        thread.daemon = True
+        thread.start()
+
+    def _spawn(self, slot):
+        started = time.perf_counter()
+        try:
+            driver = self.factory.create(self.options_builder(self.slot_profile(slot)))
+        except Exception as e:
+            print(f"Error pre-starting driver for slot {slot}: {e}")
+            self.ready.put(None)
+            return
+        self.startup_seconds.append(time.perf_counter() - started)
+        if self.is_closed:
+            driver.quit()
+            return
+        self.slots[id(driver)] = slot
+        self.ready.put(driver)
+
+    def acquire(self, timeout=None):
+        """Return a ready driver, waiting for one to finish starting if needed"""
+        try:
+            return self.ready.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, driver):
+        """Quit a used driver and start a fresh replacement in its slot"""
+        slot = self.slots.pop(id(driver), 0)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing pooled driver: {e}")
+        if not self.is_closed:
+            self.spawn(slot)
+
+    def close(self):
+        """Quit every idle driver in the pool"""
+        self.is_closed = True
+        while True:
+            try:
+                driver = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                driver.quit()
@@ -0,0 +1,74 @@
+"""
+Detection of missing, empty and unconfirmed page files in a download directory
+"""
+
+import os
+import re
+
+from .crawl_manifest import CrawlManifest
+
+
+class GapScanner:
+    def __init__(self, directory, extension='.png'):
+        self.directory = directory
+        self.extension = extension
+        self.name_pattern = re.compile(r'^(\d+)' + re.escape(extension) + '$')
+
+    def scan_files(self):
+        """Return {index: size} for every numbered page file in one directory pass"""
+        sizes = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                match = self.name_pattern.match(entry.name)
+                if match and entry.is_file():
+                    sizes[int(match.group(1))] = entry.stat().st_size
+        return sizes
+
+    def scan(self, start=None, end=None):
+        """Return missing, empty and unconfirmed indexes between start and end (inclusive)"""
+        sizes = self.scan_files()
+        records = CrawlManifest(self.directory).load()
+
+        known = set(sizes) | set(records)
+        if start is None:
+            start = min(known) if known else 0
+        if end is None:
+            end = max(known) if known else -1
+
+        # Indexes whose page was dropped as a duplicate are expected to be absent
+        duplicates = sorted(index for index, record in records.items()
+                            if record.get('status') == 'duplicate' and index not in sizes
+                            and start <= index <= end)
+        skipped = set(duplicates)
+        missing = [index for index in range(start, end + 1) if index not in sizes and index not in skipped]
+        empty = sorted(index for index, size in sizes.items() if size == 0 and start <= index <= end)
+        # Files on disk whose download the manifest never confirmed may be partial
+        unconfirmed = sorted(index for index, record in records.items()
+                             if record.get('status') not in ('done', 'duplicate') and index in sizes and sizes[index] > 0
+                             and start <= index <= end)
+
+        return {
+            'start': start,
+            'end': end,
+            'present': len(sizes) - len(empty),
+            'missing': missing,
+            'empty': empty,
+            'unconfirmed': unconfirmed,
+            'duplicates': duplicates
+        }
+
+    def gaps(self, start=None, end=None):
+        """Return the sorted indexes that need to be fetched again"""
+        result = self.scan(start, end)
+        return sorted(set(result['missing']) | set(result['empty']) | set(result['unconfirmed']))
+
+    @staticmethod
+    def format_ranges(indexes):
+        """Format indexes compactly, e.g. [1, 2, 3, 7] -> '1-3, 7'"""
+        ranges = []
+        for index in sorted(indexes):
+            if ranges and index == ranges[-1][1] + 1:
+                ranges[-1][1] = index
+            else:
+                ranges.append([index, index])
+        return ', '.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
@@ -2,15 +2,175 @@
 Image conversion module for processing downloaded images
 """
 
+import io
 import os
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from PIL import Image, ImageFile, ImageEnhance, ImageFilter
 
+from .build_cache import BuildCache
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+
+def sniff_image_format(file_path):
+    """Return the real format of an image from its first bytes ('PNG', 'JPEG', ...), or None"""
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return None
+
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if header.startswith(b'BM'):
+        return 'BMP'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def read_input(file_path):
+    """Read an input file once; return (bytes, (size, mtime, hash)) for the build cache"""
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return data, (stat.st_size, stat.st_mtime_ns, BuildCache.data_hash(data))
+
+
+def convert_file_to_png(directory_path, filename):
+    """Re-save one image as <name>.png; return (filename, error message or None, input fingerprint)"""
+    file_path = os.path.join(directory_path, filename)
+    try:
+        data, fingerprint = read_input(file_path)
+        with Image.open(io.BytesIO(data)) as img:
+            new_file_path = os.path.join(directory_path, os.path.splitext(filename)[0] + '.png')
+            img.save(new_file_path, 'PNG')
+        return filename, None, fingerprint
+    except Exception as e:
+        return filename, str(e), None
+
+
+def convert_png_chunk(directory_path, filenames):
+    """Convert a chunk of files to PNG (runs in a worker process)"""
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+    return [convert_file_to_png(directory_path, filename) for filename in filenames]
+
+
+def verify_png_chunk(directory_path, filenames):
+    """Check a chunk of PNG files for corruption without decoding pixels (runs in a worker process)"""
+    results = []
+    for filename in filenames:
+        try:
+            with Image.open(os.path.join(directory_path, filename)) as img:
+                img.verify()
+            results.append((filename, None))
+        except Exception as e:
+            results.append((filename, str(e)))
+    return results
+
+
+def convert_file_to_jpeg(source_folder, output_folder, apply_sharpness, file_name):
+    """Save one PNG as a quality-100 JPEG; return (file_name, error message or None, input fingerprint)"""
+    file_path = os.path.join(source_folder, file_name)
+    output_file_path = os.path.join(output_folder, file_name.replace('.png', '.jpg'))
+    try:
+        data, fingerprint = read_input(file_path)
+        with Image.open(io.BytesIO(data)) as img:
+            # Convert to RGB mode (JPEG only supports RGB)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            if apply_sharpness:
+                enhancer = ImageEnhance.Sharpness(img)
+                img = enhancer.enhance(1.2)
+
+            # Save as JPEG with maximum quality
+            img.save(output_file_path, 'JPEG', quality=100)
+        return file_name, None, fingerprint
+    except Exception as e:
+        return file_name, str(e), None
+
+
+def convert_jpeg_chunk(source_folder, output_folder, apply_sharpness, filenames):
+    """Convert a chunk of PNG files to JPEG (runs in a worker process)"""
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+    return [convert_file_to_jpeg(source_folder, output_folder, apply_sharpness, file_name)
+            for file_name in filenames]
+
+
+class ProgressReporter:
+    def __init__(self, callback, interval=0.25):
+        self.callback = callback
+        self.interval = interval  # Min seconds between coalesced updates
+        self._last = None
+
+    def update(self, message, current, total):
+        """Pass an update on if the interval has passed or the work is finished"""
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval and current < total:
+            return
+        self._last = now
+        self.callback(message, current, total)
+
 
 class ImageConverter:
-    def __init__(self):
+    def __init__(self, workers=None, chunk_size=8):
         # Enable loading of truncated images
         ImageFile.LOAD_TRUNCATED_IMAGES = True
+        self.workers = workers  # Worker processes; None or 0 uses every core
+        self.chunk_size = chunk_size  # Files handed to a worker at a time
+        self.use_build_cache = True  # Redo only inputs whose fingerprint or parameters changed
+        self.cancel_event = threading.Event()  # Set by cancel() to stop a running conversion
+
+    def worker_count(self):
+        """Return the number of worker processes to use"""
+        return max(1, self.workers or os.cpu_count() or 1)
+
+    def map_chunks(self, function, items, *args):
+        """Yield function(*args, chunk) results for chunks of items, in item order, until cancelled"""
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        workers = min(self.worker_count(), len(chunks))
+        if workers <= 1:
+            for chunk in chunks:
+                if self.cancel_event.is_set():
+                    return
+                yield from function(*args, chunk)
+            return
+
+        # Keep only a few chunks per worker queued so memory stays flat on large books
+        max_pending = workers * 2
+        task = partial(function, *args)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            remaining = iter(chunks)
+            try:
+                while True:
+                    while len(pending) < max_pending and not self.cancel_event.is_set():
+                        chunk = next(remaining, None)
+                        if chunk is None:
+                            break
+                        pending.append(executor.submit(task, chunk))
+                    if not pending:
+                        return
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def cancel(self):
+        """Ask a running conversion to stop after the chunks already in progress"""
+        self.cancel_event.set()
 
     def natural_sort_key(self, filename):
         """Convert a filename to a list of mixed numbers and strings for natural sorting"""
@@ -22,87 +182,144 @@ class ImageConverter:
 
         return [tryint(c) for c in re.split('([0-9]+)', filename)]
 
-    def convert_to_png(self, directory_path, callback=None):
-        """Convert all images in directory to PNG format"""
-        file_count = 0
-        misnamed_files = []
+    def scan_images(self, directory_path):
+        """List image files once and sniff their real format; return [(filename, format or None)]"""
+        images = []
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                    images.append((entry.name, sniff_image_format(entry.path)))
+        return images
+
+    def convert_to_png(self, directory_path, callback=None, verify=False, force=False):
+        """Convert images in directory to PNG format, leaving genuine PNGs untouched
+
+        Returns (file_count, converted_count, misnamed_files, skipped_count). With verify=True
+        skipped PNGs are checked for corruption and re-encoded if the check fails. force=True
+        re-converts every foreign-format file even if its PNG is up to date.
+        """
         converted_count = 0
-
-        # First pass: count files and detect misnamed files
-        for filename in os.listdir(directory_path):
-            file_path = os.path.join(directory_path, filename)
-            if os.path.isfile(file_path) and file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                file_count += 1
-                try:
-                    with Image.open(file_path) as img:
-                        if img.format != 'PNG' and file_path.lower().endswith('.png'):
-                            misnamed_files.append(filename)
-                except Exception as e:
-                    print(f"Error checking {filename}: {e}")
+        self.cancel_event.clear()
+        cache = BuildCache(directory_path) if self.use_build_cache else None
+
+        # One listing; only the first bytes of each file are read to find misnamed files
+        images = self.scan_images(directory_path)
+        file_count = len(images)
+        misnamed_files = [filename for filename, image_format in images
+                          if image_format is not None and image_format != 'PNG'
+                          and filename.lower().endswith('.png')]
+        for filename, image_format in images:
+            if image_format is None:
+                print(f"Error checking {filename}: unrecognized image format")
 
         if callback:
             callback(f"Found {file_count} image files")
 
-        # Second pass: convert to PNG
-        for filename in os.listdir(directory_path):
-            file_path = os.path.join(directory_path, filename)
-            if os.path.isfile(file_path) and file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                try:
-                    with Image.open(file_path) as img:
-                        new_file_path = os.path.join(directory_path, os.path.splitext(filename)[0] + '.png')
-                        img.save(new_file_path, 'PNG')
-                        converted_count += 1
-
-                        if filename in misnamed_files and callback:
-                            callback(f"Fixed misnamed file: {filename}")
+        # A real N.png needs no work, nor does a source whose PNG is already newer than it
+        genuine = {filename for filename, image_format in images
+                   if image_format == 'PNG' and filename.endswith('.png')}
+        filenames = []
+        for filename, image_format in images:
+            if filename in genuine:
+                continue
+            target = os.path.splitext(filename)[0] + '.png'
+            if not force and image_format is not None and target in genuine:
+                target_path = os.path.join(directory_path, target)
+                if cache is not None and cache.has_entry('png', filename):
+                    fresh = cache.is_fresh('png', filename, {}, target_path)
+                else:
+                    fresh = os.path.getmtime(target_path) >= os.path.getmtime(os.path.join(directory_path, filename))
+                if fresh:
+                    continue
+            filenames.append(filename)
+
+        if verify and genuine:
+            for filename, error in self.map_chunks(verify_png_chunk, sorted(genuine), directory_path):
+                if error is not None:
+                    print(f"Corrupt PNG {filename}: {error}")
+                    filenames.append(filename)
+
+        skipped_count = file_count - len(filenames)
+        if callback and skipped_count:
+            callback(f"Skipped {skipped_count} files that are already PNG")
+
+        # Convert to PNG, spread over worker processes
+        for filename, error, fingerprint in self.map_chunks(convert_png_chunk, filenames, directory_path):
+            if error is not None:
+                print(f"Error converting {filename}: {error}")
+                continue
+            converted_count += 1
+            target = os.path.splitext(filename)[0] + '.png'
+            if cache is not None and target != filename:
+                # The worker hashed the bytes it read, so the parent never reads them again
+                cache.remember(filename, fingerprint)
+                cache.record('png', filename, {}, os.path.join(directory_path, target))
+
+            if filename in misnamed_files and callback:
+                callback(f"Fixed misnamed file: {filename}")
 
-                        if callback:
-                            callback(f"Converted: {filename}", converted_count, file_count)
+            if callback:
+                callback(f"Converted: {filename}", converted_count, len(filenames))
 
-                except Exception as e:
-                    print(f"Error converting {filename}: {e}")
+        if self.cancel_event.is_set() and callback:
+            callback(f"Conversion cancelled after {converted_count}/{len(filenames)} files")
 
-        return file_count, converted_count, misnamed_files
+        if cache is not None:
+            cache.save()
+        return file_count, converted_count, misnamed_files, skipped_count
 
     def apply_unsharp_mask(self, image):
         """Apply unsharp mask filter to image"""
         enhanced_img = image.filter(ImageFilter.UnsharpMask(radius=3, percent=100, threshold=5))
         return enhanced_img
 
-    def convert_png_to_jpeg(self, source_folder, output_folder, apply_sharpness=True, callback=None):
-        """Convert PNG images to JPEG with optional sharpness enhancement"""
+    def convert_png_to_jpeg(self, source_folder, output_folder, apply_sharpness=True, callback=None, force=False):
+        """Convert PNG images to JPEG with optional sharpness enhancement; force=True rebuilds every file"""
+        self.cancel_event.clear()
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
 
-        files = [f for f in os.listdir(source_folder) if f.endswith('.png')]
+        cache = BuildCache(source_folder) if self.use_build_cache else None
+        params = {'sharpness': 1.2 if apply_sharpness else None, 'quality': 100}
+        output_folder = os.path.abspath(output_folder)
+
+        files = []
+        skipped = 0
+        for file_name in os.listdir(source_folder):
+            if not file_name.endswith('.png'):
+                continue
+            output_file_path = os.path.join(output_folder, file_name.replace('.png', '.jpg'))
+            if not force and cache is not None and cache.is_fresh('jpeg', file_name, params, output_file_path):
+                skipped += 1
+                continue
+            files.append(file_name)
+        if callback and skipped:
+            callback(f"Skipped {skipped} unchanged files")
+
         total_files = len(files)
         processed = 0
+        done = 0
+        progress = ProgressReporter(callback)
+
+        # Worker processes read and write the files; only names and errors come back
+        for file_name, error, fingerprint in self.map_chunks(convert_jpeg_chunk, files, source_folder, output_folder,
+                                                             apply_sharpness):
+            done += 1
+            if error is not None:
+                print(f"Error converting {file_name}: {error}")
+            else:
+                processed += 1
+                if cache is not None:
+                    output_file_path = os.path.join(output_folder, file_name.replace('.png', '.jpg'))
+                    cache.remember(file_name, fingerprint)
+                    cache.record('jpeg', file_name, params, output_file_path)
+            progress.update(f"Converted to JPEG: {processed}/{total_files} files", done, total_files)
 
-        for file_name in files:
-            file_path = os.path.join(source_folder, file_name)
-            output_file_name = file_name.replace('.png', '.jpg')
-            output_file_path = os.path.join(output_folder, output_file_name)
-
-            try:
-                with Image.open(file_path) as img:
-                    # Convert to RGB mode (JPEG only supports RGB)
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-
-                    if apply_sharpness:
-                        enhancer = ImageEnhance.Sharpness(img)
-                        img = enhancer.enhance(1.2)
-
-                    # Save as JPEG with maximum quality
-                    img.save(output_file_path, 'JPEG', quality=100)
-                    processed += 1
-
-                    if callback:
-                        callback(f"Converted to JPEG: {file_name}", processed, total_files)
-
-            except Exception as e:
-                print(f"Error converting {file_name}: {e}")
+        if self.cancel_event.is_set() and callback:
+            callback(f"Conversion cancelled after {processed}/{total_files} files")
 
+        if cache is not None:
+            cache.save()
         return processed
 
     def enhance_image_color(self, file_path, color_factor=1.5):
@@ -118,20 +335,36 @@ class ImageConverter:
 
             return img
 
-    def convert_to_pdf(self, source_folder, output_filename, enhance_color=True, color_factor=1.5, callback=None):
-        """Convert PNG images to single PDF"""
+    def convert_to_pdf(self, source_folder, output_filename, enhance_color=True, color_factor=1.5, callback=None,
+                       force=False):
+        """Convert PNG images to single PDF; skipped if no page or option changed unless force=True"""
         images = []
         files = sorted([f for f in os.listdir(source_folder) if f.endswith('.png')], key=self.natural_sort_key)
         total_files = len(files)
         processed = 0
 
+        # The PDF is one output built from every page, so any changed page rebuilds it
+        cache = BuildCache(source_folder) if self.use_build_cache else None
+        params = {'enhance_color': enhance_color, 'color_factor': color_factor if enhance_color else None}
+        output_path = os.path.abspath(output_filename)
+        if (not force and cache is not None and files and cache.names('pdf') == set(files)
+                and all(cache.is_fresh('pdf', file_name, params, output_path) for file_name in files)):
+            cache.save()
+            if callback:
+                callback(f"PDF is up to date: {output_filename}")
+            return True
+
         for file_name in files:
             file_path = os.path.join(source_folder, file_name)
             try:
+                # Read once; the cache reuses this hash instead of reading the page again
+                data, fingerprint = read_input(file_path)
+                if cache is not None:
+                    cache.remember(file_name, fingerprint)
                 if enhance_color:
-                    image = self.enhance_image_color(file_path, color_factor)
+                    image = self.enhance_image_color(io.BytesIO(data), color_factor)
                 else:
-                    with Image.open(file_path) as img:
+                    with Image.open(io.BytesIO(data)) as img:
                         if img.mode != 'RGB':
                             image = img.convert('RGB')
                         else:
@@ -148,6 +381,12 @@ class ImageConverter:
 
         if images:
             images[0].save(output_filename, save_all=True, append_images=images[1:])
+            if cache is not None:
+                cache.clear('pdf')
+                if processed == total_files:
+                    for file_name in files:
+                        cache.record('pdf', file_name, params, output_path)
+                cache.save()
             if callback:
                 callback(f"PDF created: {output_filename}")
             return True
@@ -0,0 +1,277 @@
+"""
+Persistent queue of book crawl jobs and a batch crawler that works through it
+
+Usage: python -m modules.job_queue add <url> [--priority N] | list | retry | run [--headless] [--prestart]
+       python -m modules.job_queue shard <url> --pages N [--shards K] [--headless]
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+
+from .crawl_manifest import CrawlManifest
+from .gap_scanner import GapScanner
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueue:
+    def __init__(self, queue_file='jobs.json', base_download_path=None):
+        self.queue_file = queue_file
+        if base_download_path is None:
+            self.base_download_path = os.path.join(os.getcwd(), 'Downloads')
+        else:
+            self.base_download_path = base_download_path
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load jobs from disk; jobs left running by a crash go back to pending"""
+        if not os.path.exists(self.queue_file):
+            self.jobs = []
+            return
+        with open(self.queue_file, 'r', encoding='utf-8') as f:
+            self.jobs = json.load(f)
+        for job in self.jobs:
+            if job['state'] == RUNNING:
+                job['state'] = PENDING
+
+    def save(self):
+        """Write the queue atomically so a crash never leaves a half-written file"""
+        temp_file = self.queue_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, indent=2)
+        os.replace(temp_file, self.queue_file)
+
+    def add_job(self, url, priority=0, download_path=None):
+        """Queue a book URL; returns the existing job if the URL is already queued"""
+        with self.lock:
+            for job in self.jobs:
+                if job['url'] == url:
+                    return job
+            folder = CrawlManifest.book_id(url) or re.sub(r'\W+', '_', url)[-40:]
+            job = {
+                'id': len(self.jobs) + 1,
+                'url': url,
+                'download_path': download_path or os.path.join(self.base_download_path, folder),
+                'priority': priority,
+                'state': PENDING,
+                'attempts': 0,
+                'pages': 0,
+                'error': '',
+                'added': time.time()
+            }
+            self.jobs.append(job)
+            self.save()
+            return job
+
+    def next_job(self):
+        """Claim the highest-priority pending job (oldest first within a priority)"""
+        with self.lock:
+            pending = [job for job in self.jobs if job['state'] == PENDING]
+            if not pending:
+                return None
+            job = min(pending, key=lambda j: (-j['priority'], j['added'], j['id']))
+            job['state'] = RUNNING
+            job['attempts'] += 1
+            self.save()
+            return job
+
+    def update_job(self, job_id, **fields):
+        """Update fields of a job and persist the queue"""
+        with self.lock:
+            for job in self.jobs:
+                if job['id'] == job_id:
+                    job.update(fields)
+                    self.save()
+                    return job
+        return None
+
+    def retry_failed(self):
+        """Move failed jobs back to pending"""
+        with self.lock:
+            count = 0
+            for job in self.jobs:
+                if job['state'] == FAILED:
+                    job['state'] = PENDING
+                    count += 1
+            self.save()
+            return count
+
+    def counts(self):
+        """Return the number of jobs in each state"""
+        result = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self.jobs:
+            result[job['state']] = result.get(job['state'], 0) + 1
+        return result
+
+
+class BatchCrawler:
+    def __init__(self, queue, scraper, idle_timeout=60, max_attempts=3, refetch_gaps=True):
+        self.queue = queue
+        self.scraper = scraper  # GoogleBooksScraper with an initialized driver
+        self.idle_timeout = idle_timeout
+        self.max_attempts = max_attempts
+        self.refetch_gaps = refetch_gaps  # Refetch missing or partial pages once a book is finished
+        self.is_running = False
+
+    def run(self, callback=None):
+        """Crawl queued books until the queue is empty or stop() is called"""
+        self.is_running = True
+        first = True
+        while self.is_running:
+            job = self.queue.next_job()
+            if job is None:
+                break
+            if not first and self.scraper.driver_pool:
+                # Swap in the pre-started driver so each book starts from a fresh browser
+                self.scraper.close()
+                if not self.scraper.init_driver(headless=self.scraper.headless):
+                    self.finish_job(job, FAILED, 0, "Driver failed to start", callback)
+                    continue
+            first = False
+            self.crawl_job(job, callback)
+        self.is_running = False
+
+    def crawl_job(self, job, callback=None):
+        """Crawl one book until no new pages appear for idle_timeout seconds"""
+        if callback:
+            callback(f"Starting job {job['id']}: {job['url']}")
+
+        pages = [0]
+
+        def count_pages(new_images):
+            pages[0] += len(new_images)
+
+        try:
+            self.scraper.set_download_path(job['download_path'])
+            self.scraper.idle_timeout = self.idle_timeout
+            if not self.scraper.navigate_to_book(job['url']):
+                raise RuntimeError("Navigation failed")
+            self.scraper.start_scraping(count_pages)
+            self.scraper.download_tracker.wait_all(timeout=self.scraper.download_tracker.stall_timeout)
+            if self.refetch_gaps and self.scraper.reached_end and self.is_running:
+                self.fill_gaps(job, count_pages, callback)
+        except Exception as e:
+            self.finish_job(job, FAILED, pages[0], str(e), callback)
+            return
+
+        if not self.scraper.reached_end:
+            # Stopped by the user: leave the job for the next run
+            self.queue.update_job(job['id'], state=PENDING, pages=job['pages'] + pages[0])
+            if callback:
+                callback(f"Job {job['id']} interrupted after {pages[0]} pages")
+        elif pages[0] == 0 and not self.scraper.manifest.exists():
+            self.finish_job(job, FAILED, 0, "No pages found", callback)
+        else:
+            self.finish_job(job, DONE, pages[0], '', callback)
+
+    def fill_gaps(self, job, on_pages, callback=None):
+        """Refetch the missing, empty and unconfirmed pages of a finished book"""
+        gaps = GapScanner(job['download_path']).gaps()
+        if not gaps:
+            return
+        remaining = self.scraper.refetch_pages(gaps, on_pages)
+        self.scraper.reached_end = True  # refetch_pages leaves the scraper stopped
+        if callback:
+            callback(f"Job {job['id']}: refetched {len(gaps) - len(remaining)} of {len(gaps)} missing pages"
+                     + (f", still missing {GapScanner.format_ranges(remaining)}" if remaining else ""))
+
+    def finish_job(self, job, state, pages, error, callback=None):
+        """Record the outcome of a job, re-queueing failures until max_attempts"""
+        if state == FAILED and job['attempts'] < self.max_attempts:
+            state = PENDING
+        self.queue.update_job(job['id'], state=state, pages=job['pages'] + pages, error=error)
+        if callback:
+            callback(f"Job {job['id']} {state}: {pages} pages{' - ' + error if error else ''}")
+
+    def stop(self):
+        """Stop after the current page cycle; the running job returns to pending"""
+        self.is_running = False
+        self.scraper.stop_scraping()
+
+
+def main(argv=None):
+    """Command-line entry point for queueing books and crawling them unattended"""
+    parser = argparse.ArgumentParser(prog='python -m modules.job_queue', description="Crawl queued books unattended")
+    parser.add_argument('--queue-file', default='jobs.json')
+    parser.add_argument('--downloads', default=None, help="Base download directory (default: ./Downloads)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Queue book URLs")
+    add.add_argument('urls', nargs='+')
+    add.add_argument('--priority', type=int, default=0)
+    commands.add_parser('list', help="Show queued jobs")
+    commands.add_parser('retry', help="Move failed jobs back to pending")
+
+    run = commands.add_parser('run', help="Crawl pending jobs until the queue is empty")
+    run.add_argument('--headless', action='store_true')
+    run.add_argument('--prestart', action='store_true', help="Pre-start the next book's browser")
+    run.add_argument('--idle-timeout', type=float, default=60)
+
+    shard = commands.add_parser('shard', help="Crawl one book with several browsers")
+    shard.add_argument('url')
+    shard.add_argument('--pages', type=int, required=True, help="Approximate page count of the book")
+    shard.add_argument('--shards', type=int, default=2)
+    shard.add_argument('--headless', action='store_true')
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.queue_file, args.downloads)
+    if args.command == 'add':
+        for url in args.urls:
+            job = queue.add_job(url, args.priority)
+            print(f"Job {job['id']} {job['state']}: {url} -> {job['download_path']}")
+    elif args.command == 'list':
+        for job in queue.jobs:
+            error = f" ({job['error']})" if job['error'] else ''
+            print(f"{job['id']:>4} {job['state']:<8} {job['pages']:>5} pages  {job['url']}{error}")
+        print(', '.join(f"{count} {state}" for state, count in queue.counts().items()))
+    elif args.command == 'retry':
+        print(f"{queue.retry_failed()} failed jobs moved back to pending")
+    elif args.command == 'run':
+        from .scraper import GoogleBooksScraper
+        from .driver_pool import DriverPool
+
+        scraper = GoogleBooksScraper(queue.base_download_path)
+        if args.prestart:
+            scraper.driver_pool = DriverPool(
+                lambda profile_dir: scraper.build_chrome_options(profile_dir, headless=args.headless),
+                profile_dir=scraper.profile_dir)
+            scraper.driver_pool.start()
+        if not scraper.init_driver(headless=args.headless):
+            return 1
+        crawler = BatchCrawler(queue, scraper, idle_timeout=args.idle_timeout)
+        try:
+            crawler.run(print)
+        except KeyboardInterrupt:
+            crawler.stop()
+        finally:
+            scraper.close()
+            if scraper.driver_pool:
+                scraper.driver_pool.close()
+        print(', '.join(f"{count} {state}" for state, count in queue.counts().items()))
+    elif args.command == 'shard':
+        from .shard_coordinator import ShardCoordinator
+
+        download_path = os.path.join(queue.base_download_path, CrawlManifest.book_id(args.url) or 'book')
+        coordinator = ShardCoordinator(args.url, download_path, args.pages, args.shards)
+        try:
+            coordinator.launch(print, headless=args.headless)
+            coordinator.run(print)
+            coordinator.merge(print)
+        except KeyboardInterrupt:
+            coordinator.stop()
+        finally:
+            coordinator.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+"""
+Capture of page image responses from Chrome's DevTools network events
+"""
+
+import base64
+import json
+import re
+
+
+class NetworkCapture:
+    def __init__(self, driver, page_pattern=r'[?&]pg=(?:GBS\.)?PT(\d+)'):
+        self.driver = driver
+        # Only responses matching this are pages; the group is the 1-based page position
+        self.page_pattern = re.compile(page_pattern)
+        self.responses = {}  # requestId -> url of image responses still loading
+        self.enabled = False
+
+    def enable(self):
+        """Turn on DevTools network events (performance logging must be on in the driver)"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.enabled = True
+
+    def page_id(self, url):
+        """Return the 0-based reader page id in a response URL, or None if it is not a page image"""
+        match = self.page_pattern.search(url)
+        return int(match.group(1)) - 1 if match else None
+
+    def poll(self):
+        """Read buffered network events and return (request_id, url) of finished page image responses"""
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if response.get('mimeType', '').startswith('image/'):
+                    self.responses[params['requestId']] = response.get('url', '')
+            elif method == 'Network.loadingFinished':
+                url = self.responses.pop(params.get('requestId'), None)
+                # Cached responses report a near-zero encoded length, so size says nothing here
+                if url is not None and self.page_id(url) is not None:
+                    finished.append((params['requestId'], url))
+            elif method == 'Network.loadingFailed':
+                self.responses.pop(params.get('requestId'), None)
+        return finished
+
+    def fetch_body(self, request_id):
+        """Return the body of a finished response as bytes"""
+        result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        if result.get('base64Encoded'):
+            return base64.b64decode(result['body'])
+        return result['body'].encode('latin-1')
@@ -0,0 +1,83 @@
+"""
+Content fingerprints of downloaded pages used to catch re-rendered duplicates
+"""
+
+import hashlib
+import io
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: only needed for perceptual hashing
+    Image = None
+
+
+class PageFingerprints:
+    def __init__(self, use_perceptual=False, max_distance=4, window=50):
+        self.use_perceptual = use_perceptual and Image is not None
+        self.max_distance = max_distance  # Max differing bits for a perceptual match
+        self.window = window  # Only pages this many indexes back count as duplicates
+        self._exact = {}  # content digest -> index
+        self._perceptual = {}  # index -> 64-bit difference hash
+
+    def exact_digest(self, data):
+        """Return the content digest of page bytes"""
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def perceptual_hash(self, data):
+        """Return a 64-bit difference hash of page bytes, or None if they cannot be decoded"""
+        if Image is None:
+            return None
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                img.draft('L', (64, 64))  # Let JPEG decode at reduced size
+                pixels = list(img.convert('L').resize((9, 8), Image.BILINEAR).getdata())
+        except Exception:
+            return None
+
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        return value
+
+    def in_window(self, original, index):
+        """Check whether an earlier page is close enough to be a re-render of this one"""
+        return self.window is None or index is None or 0 <= index - original <= self.window
+
+    def match(self, data, index=None):
+        """Return (original index, content digest) for duplicate bytes, or (None, digest)"""
+        digest = self.exact_digest(data)
+        original = self._exact.get(digest)
+        if original is not None and original != index and self.in_window(original, index):
+            return original, digest
+
+        if self.use_perceptual:
+            value = self.perceptual_hash(data)
+            if value is not None:
+                for original, other in self._perceptual.items():
+                    if (original != index and self.in_window(original, index)
+                            and bin(value ^ other).count('1') <= self.max_distance):
+                        return original, digest
+                if index is not None:
+                    self._perceptual[index] = value
+                    if self.window is not None:
+                        # Keep the linear scan short by dropping pages outside the window
+                        for old in [old for old in self._perceptual if old < index - self.window]:
+                            del self._perceptual[old]
+        return None, digest
+
+    def index_of(self, digest):
+        """Return the index of the latest kept page with exactly these content digest bytes, or None"""
+        return self._exact.get(digest)
+
+    def add(self, index, digest):
+        """Remember the content digest of a kept page"""
+        self._exact[digest] = index  # The latest copy keeps the match inside a sliding window
+
+    def clear(self):
+        """Forget every fingerprint"""
+        self._exact.clear()
+        self._perceptual.clear()
+
+    def __len__(self):
+        return len(self._exact)
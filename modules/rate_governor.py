@@ -0,0 +1,98 @@
+"""
+Token-bucket rate governor that adapts the page fetch rate to reader health
+"""
+
+import time
+
+
+class RateGovernor:
+    def __init__(self, rate=1.0, min_rate=0.2, max_rate=10.0, burst=8, increase=0.05, backoff=0.5,
+                 spike_factor=3.0, min_spike=0.5, empty_limit=2):
+        self.rate = rate  # Pages per second currently allowed
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst  # Tokens that can be saved up while the loop is idle
+        self.increase = increase  # Pages/second added per page of a clean cycle
+        self.backoff = backoff  # Rate multiplier applied on a bad signal
+        self.spike_factor = spike_factor  # Latency this many times the baseline is a spike
+        self.min_spike = min_spike  # Latencies below this many seconds never count as spikes
+        self.empty_limit = empty_limit  # Consecutive empty renders before backing off
+
+        self.tokens = float(burst)
+        self.baseline_latency = None  # Smoothed seconds per page fetch
+        self.empty_cycles = 0
+        self.events = []  # (time, reason, old rate, new rate) for every back-off
+        self._updated = time.monotonic()
+
+    def refill(self):
+        """Add the tokens earned since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self):
+        """Check whether a page could be fetched now without waiting"""
+        self.refill()
+        return self.tokens >= 1
+
+    def acquire(self, should_continue=None):
+        """Block until a page may be fetched; return False if should_continue turns false"""
+        while True:
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            if should_continue is not None and not should_continue():
+                return False
+            time.sleep(min(0.5, (1 - self.tokens) / self.rate))
+
+    def back_off(self, reason):
+        """Cut the rate after a bad signal and record the event"""
+        old = self.rate
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self.tokens = min(self.tokens, 1.0)  # Drop saved-up burst so the cut takes effect now
+        self.events.append((time.time(), reason, old, self.rate))
+        return reason
+
+    def record_cycle(self, pages, failures=0, latency=None, empty=False):
+        """Adapt the rate from one cycle; return the back-off reason or None"""
+        if failures:
+            return self.back_off('failure')
+
+        if latency is not None and pages:
+            spike = (self.baseline_latency is not None and latency > self.min_spike
+                     and latency > self.baseline_latency * self.spike_factor)
+            if spike:
+                return self.back_off('latency')
+            if self.baseline_latency is None:
+                self.baseline_latency = latency
+            else:
+                self.baseline_latency = 0.8 * self.baseline_latency + 0.2 * latency
+
+        if empty:
+            self.empty_cycles += 1
+            if self.empty_cycles >= self.empty_limit:
+                self.empty_cycles = 0
+                return self.back_off('empty')
+            return None
+        self.empty_cycles = 0
+
+        if pages:
+            if not self.events:
+                # Slow start: double until the first bad signal shows where the limit is
+                self.rate = min(self.max_rate, self.rate * 2)
+            else:
+                # Additive increase per page while the reader keeps up
+                self.rate = min(self.max_rate, self.rate + self.increase * pages)
+        return None
+
+    def pages_per_minute(self):
+        """Return the currently allowed rate in pages/minute"""
+        return self.rate * 60.0
+
+    def backoff_counts(self):
+        """Return {reason: count} of back-off events"""
+        counts = {}
+        for event in self.events:
+            counts[event[1]] = counts.get(event[1], 0) + 1
+        return counts
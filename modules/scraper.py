@@ -7,18 +7,304 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import undetected_chromedriver as uc
+import base64
+import bisect
 import time
 import os
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from .seen_index import SeenIndex
+from .scroll_controller import ScrollController
+from .download_tracker import DownloadTracker
+from .crawl_manifest import CrawlManifest
+from .driver_pool import DriverFactory
+from .network_capture import NetworkCapture
+from .crawl_metrics import CrawlMetrics
+from .page_fingerprint import PageFingerprints
+from .rate_governor import RateGovernor
+
+
+# URL patterns blocked in low-overhead mode; page images are blob URLs and unaffected
+BLOCKED_URL_PATTERNS = [
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*play.google.com/log*', '*/gen_204*', '*csi.gstatic.com*',
+    '*.mp4', '*.webm'
+]
+
+
+# Returns the absolute page number of a virtual-scroll <li>: from its position
+# attributes when the reader sets them, otherwise from its offset in the scroll
+# content divided by the item pitch (the distance between the tops of
+# consecutive items, so the margins between pages count). null when it cannot
+# be determined. gbcPitch is shared with SEEK_SCRIPT so seeks land where ids say.
+PAGE_ID_FUNCTION = """
+function gbcPitch(wrapper, li) {
+    var rect = li.getBoundingClientRect();
+    var pitch = 0;
+    if (li.nextElementSibling) { pitch = li.nextElementSibling.getBoundingClientRect().top - rect.top; }
+    else if (li.previousElementSibling) { pitch = rect.top - li.previousElementSibling.getBoundingClientRect().top; }
+    if (!(pitch > 0)) {
+        var count = wrapper.querySelectorAll('ol > li').length;
+        pitch = count ? wrapper.getBoundingClientRect().height / count : rect.height;
+    }
+    return pitch;
+}
+function gbcPageId(li) {
+    var attr = li.getAttribute('aria-posinset');
+    if (attr && !isNaN(attr)) { return parseInt(attr, 10) - 1; }
+    attr = li.getAttribute('data-index');
+    if (attr && !isNaN(attr)) { return parseInt(attr, 10); }
+    var wrapper = li.closest('.cdk-virtual-scroll-content-wrapper');
+    var viewport = wrapper && (wrapper.closest('cdk-virtual-scroll-viewport') || wrapper.parentElement);
+    var rect = li.getBoundingClientRect();
+    if (!viewport || !rect.height) { return null; }
+    var contentTop = viewport.getBoundingClientRect().top - viewport.scrollTop;
+    return Math.round((rect.top - contentTop) / gbcPitch(wrapper, li));
+}
+"""
+
+# Returns the page ids of the <li> elements passed in arguments[0] (element walk fallback).
+PAGE_IDS_SCRIPT = PAGE_ID_FUNCTION + """
+return Array.prototype.map.call(arguments[0], gbcPageId);
+"""
+
+# Collects every rendered page image in the virtual-scroll list as
+# [position, src, page id] and, when arguments[0] is true, scrolls the last
+# item into view, all in a single WebDriver round trip.
+HARVEST_SCRIPT = PAGE_ID_FUNCTION + """
+var wrapper = document.querySelector('.cdk-virtual-scroll-content-wrapper');
+if (!wrapper) { return null; }
+var items = wrapper.querySelectorAll('ol > li');
+var pages = [];
+for (var i = 0; i < items.length; i++) {
+    var img = items[i].querySelector('reader-rendered-page img');
+    if (img && img.src) { pages.push([i, img.src, gbcPageId(items[i])]); }
+}
+if (arguments[0] && items.length) { items[items.length - 1].scrollIntoView(); }
+return pages;
+"""
+
+# Installs a MutationObserver on the virtual-scroll wrapper that queues newly
+# rendered page image srcs as [position, src, page id] in window.__gbcQueue.
+OBSERVER_INSTALL_SCRIPT = PAGE_ID_FUNCTION + """
+var wrapper = document.querySelector('.cdk-virtual-scroll-content-wrapper');
+if (!wrapper) { return false; }
+if (window.__gbcObserver && window.__gbcObservedWrapper === wrapper) { return true; }
+if (window.__gbcObserver) { window.__gbcObserver.disconnect(); }
+window.__gbcQueue = [];
+window.__gbcQueued = {};
+function queueImage(img) {
+    if (!img.src || window.__gbcQueued[img.src]) { return; }
+    var li = img.closest('li');
+    var position = li && li.parentNode ? Array.prototype.indexOf.call(li.parentNode.children, li) : -1;
+    window.__gbcQueued[img.src] = true;
+    window.__gbcQueue.push([position, img.src, li ? gbcPageId(li) : null]);
+    if (window.__gbcWake) {
+        var wake = window.__gbcWake;
+        window.__gbcWake = null;
+        wake();
+    }
+}
+function scan(node) {
+    if (node.nodeType !== 1) { return; }
+    if (node.tagName === 'IMG') {
+        if (node.closest('reader-rendered-page')) { queueImage(node); }
+        return;
+    }
+    node.querySelectorAll('reader-rendered-page img').forEach(queueImage);
+}
+window.__gbcObserver = new MutationObserver(function(mutations) {
+    mutations.forEach(function(m) {
+        if (m.type === 'attributes') { scan(m.target); }
+        else { m.addedNodes.forEach(scan); }
+    });
+});
+window.__gbcObserver.observe(wrapper, {childList: true, subtree: true, attributes: true, attributeFilter: ['src']});
+window.__gbcObservedWrapper = wrapper;
+scan(wrapper);
+return true;
+"""
+
+# Waits until the observer queue has entries (or the timeout expires), then
+# returns and clears the queue. Returns null when the observer is gone, e.g.
+# after a navigation.
+OBSERVER_DRAIN_SCRIPT = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+if (!window.__gbcQueue) { done(null); return; }
+function flush() {
+    var pages = window.__gbcQueue;
+    window.__gbcQueue = [];
+    done(pages);
+}
+if (window.__gbcQueue.length) { flush(); return; }
+var timer = setTimeout(function() { window.__gbcWake = null; flush(); }, timeoutMs);
+window.__gbcWake = function() { clearTimeout(timer); setTimeout(flush, 50); };
+"""
+
+# Scrolls the reader forward by up to arguments[0] pages past the last rendered
+# page. It never moves past the first page that is still rendering or past the
+# end of the list, so no page leaves the virtual scroll range unrendered.
+SCROLL_AHEAD_SCRIPT = """
+var pages = arguments[0];
+var wrapper = document.querySelector('.cdk-virtual-scroll-content-wrapper');
+if (!wrapper) { return null; }
+var items = wrapper.querySelectorAll('ol > li');
+if (!items.length) { return null; }
+var target = items.length - 1;
+var lastRendered = -1;
+for (var i = 0; i < items.length; i++) {
+    var img = items[i].querySelector('reader-rendered-page img');
+    if (img && img.src) {
+        lastRendered = i;
+    } else {
+        target = i;
+        break;
+    }
+}
+target = Math.min(target, lastRendered + pages);
+items[Math.max(target, 0)].scrollIntoView();
+return target;
+"""
+
+# Scrolls the virtual-scroll viewport so that the given page offset is at the top,
+# stepping by the same item pitch that gbcPageId divides by.
+SEEK_SCRIPT = PAGE_ID_FUNCTION + """
+var page = arguments[0];
+var wrapper = document.querySelector('.cdk-virtual-scroll-content-wrapper');
+if (!wrapper) { return null; }
+var viewport = wrapper.closest('cdk-virtual-scroll-viewport') || wrapper.parentElement;
+var items = wrapper.querySelectorAll('ol > li');
+if (!viewport || !items.length) { return null; }
+var pitch = gbcPitch(wrapper, items[0]) || viewport.clientHeight;
+// Measure from a rendered item with a known id so leading padding is kept
+var anchor = gbcPageId(items[0]);
+var contentTop = viewport.getBoundingClientRect().top - viewport.scrollTop;
+var anchorTop = anchor === null ? 0 : items[0].getBoundingClientRect().top - contentTop - anchor * pitch;
+viewport.scrollTop = anchorTop + pitch * page;
+return viewport.scrollTop;
+"""
+
+# Fetches a blob URL inside the page and hands its bytes back to Python as base64.
+FETCH_BYTES_SCRIPT = """
+var blobUrl = arguments[0];
+var done = arguments[arguments.length - 1];
+fetch(blobUrl)
+    .then(function(response) { return response.blob(); })
+    .then(function(blob) {
+        var reader = new FileReader();
+        reader.onloadend = function() {
+            var result = reader.result;
+            done({data: result.substring(result.indexOf(',') + 1)});
+        };
+        reader.readAsDataURL(blob);
+    })
+    .catch(function(error) { done({error: String(error)}); });
+"""
+
+# Fetches several blob URLs in parallel and returns [{data} | {error}] in order.
+FETCH_MANY_SCRIPT = """
+var urls = arguments[0];
+var done = arguments[arguments.length - 1];
+Promise.all(urls.map(function(blobUrl) {
+    return fetch(blobUrl)
+        .then(function(response) { return response.blob(); })
+        .then(function(blob) {
+            return new Promise(function(resolve) {
+                var reader = new FileReader();
+                reader.onloadend = function() {
+                    var result = reader.result;
+                    resolve({data: result.substring(result.indexOf(',') + 1)});
+                };
+                reader.readAsDataURL(blob);
+            });
+        })
+        .catch(function(error) { return {error: String(error)}; });
+})).then(done);
+"""
+
+# Page helper library installed once per document (and into every new document
+# through DevTools) so that per-cycle calls only pass arguments. It reuses the
+# standalone scripts above as function bodies.
+PAGE_HELPER_SCRIPT = """
+(function() {
+    if (window.__gbc) { return; }
+    var seen = {};
+    window.__gbc = {
+        harvest: function() {%s},
+        scrollAhead: function() {%s},
+        seek: function() {%s},
+        collectNewSrcs: function(scroll) {
+            var pages = window.__gbc.harvest(scroll);
+            if (!pages) { return pages; }
+            return pages.filter(function(page) {
+                if (seen[page[1]]) { return false; }
+                seen[page[1]] = true;
+                return true;
+            });
+        },
+        resetSeen: function() { seen = {}; return true; },
+        downloadMany: function(entries) {
+            entries.forEach(function(entry) {
+                fetch(entry[0])
+                    .then(function(response) { return response.blob(); })
+                    .then(function(blob) {
+                        var url = window.URL.createObjectURL(blob);
+                        var a = document.createElement('a');
+                        a.style.display = 'none';
+                        a.href = url;
+                        a.download = entry[1];
+                        document.body.appendChild(a);
+                        a.click();
+                        window.URL.revokeObjectURL(url);
+                        document.body.removeChild(a);
+                    })
+                    .catch(function(error) { console.error('Image download failed:', error); });
+            });
+            return entries.length;
+        }
+    };
+})();
+""" % (HARVEST_SCRIPT, SCROLL_AHEAD_SCRIPT, SEEK_SCRIPT)
+
+HELPER_MISSING = '__gbc_missing__'
+_helper_calls = {}
+
+
+def helper_call_script(name):
+    """Return the (cached) one-line script that calls a page helper function"""
+    if name not in _helper_calls:
+        _helper_calls[name] = (f"return window.__gbc ? window.__gbc.{name}.apply(null, arguments) "
+                               f": '{HELPER_MISSING}';")
+    return _helper_calls[name]
+
 
 class GoogleBooksScraper:
-    def __init__(self, download_path=None, use_profile=True):
+    def __init__(self, download_path=None, use_profile=True, bounded_memory=False, profile_dir=None,
+                 driver_pool=None, driver_factory=None):
         self.driver = None
-        self.book_list = []
+        self.headless = False
+        self.driver_pool = driver_pool  # Optional DriverPool of pre-started drivers
+        self.driver_factory = driver_factory or DriverFactory()
+        self.init_started = None
+        self.driver_start_seconds = None
+        self.time_to_first_page = None
+        # Seen page URLs; bounded_memory keeps only digests instead of full blob URLs
+        self.book_list = SeenIndex(keep_urls=not bounded_memory)
         self.force_startnum = 0
         self.is_running = False
         self.use_profile = use_profile
         self.current_index = 0  # Track current index for display
+        self.stop_index = None  # Stop once this index has been assigned (sharded crawls)
+        self.start_page = None  # Reader pages before this one belong to another shard
+        self.idle_timeout = None  # Seconds without new pages before the book is treated as finished
+        self.reached_end = False
 
         if download_path is None:
             self.download_path = os.path.join(os.getcwd(), 'Downloads')
@@ -28,20 +314,140 @@ class GoogleBooksScraper:
         # Create download directory if it doesn't exist
         os.makedirs(self.download_path, exist_ok=True)
 
+        # 'bulk' harvests all page srcs with one script call, 'element' walks each <li>
+        self.harvest_mode = 'bulk'
+        self.driver_calls = 0  # WebDriver calls made during the current cycle
+        self.last_cycle_driver_calls = 0
+
+        # 'browser' uses Chrome's download manager, 'bytes' returns the blob to Python
+        self.download_mode = 'browser'
+        self.download_stats = {'files': 0, 'bytes': 0, 'seconds': 0.0}
+
+        # 'poll' harvests every 2 seconds, 'observe' waits on a MutationObserver queue
+        self.discovery_mode = 'poll'
+        self.observe_timeout = 5.0  # Max seconds to block waiting for new pages
+
+        # 'dom' reads blob URLs from the reader, 'network' saves image responses
+        # from DevTools network events (set before init_driver)
+        self.capture_mode = 'dom'
+        self.network_capture = None
+
+        # Reader frame context kept across cycles; re-resolved after errors or navigation
+        self.cache_frame = True
+        self._reader_wrapper = None
+        self._observer_ready = False
+        self._script_timeout = None
+
+        # 'discovery' numbers files in the order pages are found, 'page' uses the
+        # reader's page number so pages can be fetched in any order
+        self.naming_mode = 'discovery'
+        self.target_pages = None  # reader page id -> index; only these are downloaded during a targeted refetch
+        self.visible_page_ids = []  # Reader page ids rendered at the last harvest
+
+        # Call functions of the injected page helper instead of sending script source
+        self.use_page_helper = True
+
+        # Per-cycle stage timings, page and error counts
+        self.metrics = CrawlMetrics()
+
+        # Keeps pages of lookahead requested and paces the scraping loop
+        self.scroll_controller = ScrollController()
+
+        # Token bucket on page fetches; backs off on failures, empty renders and latency spikes
+        self.use_rate_governor = True
+        self.rate_governor = RateGovernor()
+
+        # Caps pending downloads and pauses discovery while the window is full
+        self.download_tracker = DownloadTracker(self.download_path, on_complete=self.on_download_complete)
+
+        # Manifest in the download directory used to resume crawls. Records carry the book id
+        # and the reader page id, which (unlike blob URLs) stay the same across sessions
+        self.use_manifest = True
+        self.manifest = CrawlManifest(self.download_path)
+        self.manifest_loaded = False
+        self.book_id = None
+        self.seen_pages = set()  # Reader page ids already requested in this book
+        self.retry_pages = {}  # reader page id -> index of pages requested but never confirmed
+        self.retry_indexes = {}  # digest -> index, for records without a reader page id
+        self._pending_records = {}  # file name -> (index, digest, reader page id)
+
+        # Content fingerprints catch a re-rendered page arriving under a new blob URL. Blank and
+        # separator pages genuinely repeat, so 'flag' keeps the file and records the match, 'remove'
+        # drops an exact repeat inside the window unless the two carry different reader page ids,
+        # and 'off' skips hashing
+        self.dedupe_mode = 'flag'
+        self.fingerprints = PageFingerprints()
+        self.duplicate_pages = {}  # index -> index of the page it duplicates
+        self._reader_ids = {}  # index -> reader page id of the page saved there
+        self._page_content = {}  # file name -> manifest fields of a fingerprinted page
+
         # Set up Chrome profile directory
-        self.profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
+        if profile_dir is None:
+            self.profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
+        else:
+            self.profile_dir = profile_dir
         if self.use_profile:
             os.makedirs(self.profile_dir, exist_ok=True)
 
-    def init_driver(self, use_existing_profile=True, window_size=None, window_position=None):
+    def init_driver(self, use_existing_profile=True, window_size=None, window_position=None,
+                    headless=False, block_resources=None):
         """Initialize Chrome driver with undetected-chromedriver"""
+        self.headless = headless
+        if block_resources is None:
+            block_resources = headless
+        self.init_started = time.perf_counter()
+        self.time_to_first_page = None
+
+        try:
+            if self.driver_pool:
+                self.driver = self.driver_pool.acquire(timeout=120)
+                if self.driver is None:
+                    raise RuntimeError("No pooled driver became ready")
+                self.apply_download_path()
+            else:
+                profile_dir = self.profile_dir if self.use_profile and use_existing_profile else None
+                chrome_options = self.build_chrome_options(profile_dir, window_size, window_position, headless)
+                self.driver = self.driver_factory.create(chrome_options)
+            self.driver_start_seconds = time.perf_counter() - self.init_started
+
+            # Double-check window position and size after creation
+            # This ensures the exact position even if Chrome ignores initial arguments
+            if window_position and window_size and not headless:
+                # Immediately try to set window size without delay
+                try:
+                    self.driver.set_window_position(window_position[0], window_position[1])
+                    self.driver.set_window_size(window_size[0], window_size[1])
+                except:
+                    # If immediate setting fails, use minimal delay
+                    time.sleep(0.1)  # Very short delay only if needed
+                    self.driver.set_window_position(window_position[0], window_position[1])
+                    self.driver.set_window_size(window_size[0], window_size[1])
+
+            if block_resources:
+                self.block_resources()
+
+            if self.use_page_helper:
+                self.install_page_helper()
+
+            if self.capture_mode == 'network':
+                self.network_capture = NetworkCapture(self.driver)
+                self.network_capture.enable()
+
+            self.process_start_usage = self.get_process_usage()
+            return True
+        except Exception as e:
+            print(f"Error initializing driver: {e}")
+            return False
+
+    def build_chrome_options(self, profile_dir=None, window_size=None, window_position=None, headless=False):
+        """Build a fresh ChromeOptions object (undetected-chromedriver cannot reuse one)"""
         chrome_options = uc.ChromeOptions()
 
         # Use persistent profile to maintain login sessions
-        if self.use_profile and use_existing_profile:
-            chrome_options.add_argument(f'--user-data-dir={self.profile_dir}')
+        if profile_dir:
+            chrome_options.add_argument(f'--user-data-dir={profile_dir}')
             chrome_options.add_argument('--profile-directory=Default')
-            print(f"Using Chrome profile from: {self.profile_dir}")
+            print(f"Using Chrome profile from: {profile_dir}")
 
         # Set initial window size and position to prevent flashing
         if window_size:
@@ -49,6 +455,18 @@ class GoogleBooksScraper:
         if window_position:
             chrome_options.add_argument(f'--window-position={window_position[0]},{window_position[1]}')
 
+        # Headless, low-overhead mode for crawl machines; the profile (and login) is still used
+        if headless:
+            chrome_options.add_argument('--headless=new')
+            if not window_size:
+                chrome_options.add_argument('--window-size=1200,800')
+            chrome_options.add_argument('--disable-gpu')
+            chrome_options.add_argument('--mute-audio')
+            chrome_options.add_argument('--disable-extensions')
+            chrome_options.add_argument('--disable-background-timer-throttling')
+            chrome_options.add_argument('--disable-renderer-backgrounding')
+            chrome_options.add_argument('--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication')
+
         # Start maximized to prevent initial small window
         # chrome_options.add_argument('--start-maximized')  # Comment out if you want exact size
 
@@ -62,6 +480,10 @@ class GoogleBooksScraper:
             "profile.default_content_setting_values.automatic_downloads": 1
         })
 
+        # Network capture reads DevTools events from the performance log
+        if self.capture_mode == 'network':
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
         # Additional options for better stability
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
@@ -71,37 +493,104 @@ class GoogleBooksScraper:
         chrome_options.add_argument('--disable-session-crashed-bubble')
         chrome_options.add_argument('--disable-infobars')
 
+        return chrome_options
+
+    def install_page_helper(self):
+        """Register the page helper to run in every new document"""
         try:
-            self.driver = uc.Chrome(options=chrome_options)
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': PAGE_HELPER_SCRIPT})
+            return True
+        except Exception as e:
+            print(f"Error installing page helper: {e}")
+            return False
 
-            # Double-check window position and size after creation
-            # This ensures the exact position even if Chrome ignores initial arguments
-            if window_position and window_size:
-                # Immediately try to set window size without delay
-                try:
-                    self.driver.set_window_position(window_position[0], window_position[1])
-                    self.driver.set_window_size(window_size[0], window_size[1])
-                except:
-                    # If immediate setting fails, use minimal delay
-                    import time
-                    time.sleep(0.1)  # Very short delay only if needed
-                    self.driver.set_window_position(window_position[0], window_position[1])
-                    self.driver.set_window_size(window_size[0], window_size[1])
+    def call_helper(self, name, *args):
+        """Call a page helper function, injecting the helper first if this document lacks it"""
+        script = helper_call_script(name)
+        result = self.driver.execute_script(script, *args)
+        if result == HELPER_MISSING:
+            # Documents loaded before install_page_helper() never got the helper
+            self.driver_calls += 2
+            self.driver.execute_script(PAGE_HELPER_SCRIPT)
+            result = self.driver.execute_script(script, *args)
+        return result
 
+    def block_resources(self, patterns=None):
+        """Block fonts, analytics and media requests through DevTools"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or BLOCKED_URL_PATTERNS})
             return True
         except Exception as e:
-            print(f"Error initializing driver: {e}")
+            print(f"Error blocking resources: {e}")
             return False
 
+    def get_process_usage(self):
+        """Return (cpu_seconds, rss_bytes) summed over chromedriver and its Chrome processes"""
+        if psutil is None or not self.driver:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+
+        cpu_seconds = 0.0
+        rss = 0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+                cpu_seconds += times.user + times.system
+                rss += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return cpu_seconds, rss
+
+    def get_resource_usage_per_page(self):
+        """Return CPU seconds and current RSS per crawled page since the driver started"""
+        usage = self.get_process_usage()
+        start = getattr(self, 'process_start_usage', None)
+        pages = self.download_stats['files']
+        if usage is None or start is None or pages == 0:
+            return None
+        return {
+            'mode': 'headless' if getattr(self, 'headless', False) else 'windowed',
+            'pages': pages,
+            'cpu_seconds_per_page': (usage[0] - start[0]) / pages,
+            'rss_bytes': usage[1],
+            'rss_bytes_per_page': usage[1] / pages
+        }
+
     def navigate_to_book(self, book_url):
         """Navigate to Google Books URL"""
         if not self.driver:
             return False
+        self.invalidate_reader_frame()
         self.driver.get(book_url)
+        self.book_id = CrawlManifest.book_id(book_url)
         return True
 
     def download_image(self, image_url, file_name):
+        """Download image with the selected transport"""
+        started = time.perf_counter()
+        if self.download_mode == 'bytes':
+            size = self.download_image_bytes(image_url, file_name)
+            if size is None:
+                return None  # Dropped as a duplicate
+        else:
+            self.download_image_browser(image_url, file_name)
+            size = 0
+        self.download_stats['files'] += 1
+        self.download_stats['bytes'] += size
+        self.download_stats['seconds'] += time.perf_counter() - started
+        return size
+
+    def download_image_browser(self, image_url, file_name):
         """Download image using JavaScript injection"""
+        if self.use_page_helper:
+            self.call_helper('downloadMany', [[image_url, f"{file_name}.png"]])
+            return
+
         javascript = f"""(function() {{
         var blobUrl = "{image_url}";
 
@@ -127,64 +616,781 @@ class GoogleBooksScraper:
 
         self.driver.execute_script(javascript)
 
-    def scrape_current_page(self):
-        """Scrape images from current page"""
-        try:
+    def download_image_bytes(self, image_url, file_name):
+        """Fetch image bytes into Python and write them atomically as <file_name>.png"""
+        result = self.driver.execute_async_script(FETCH_BYTES_SCRIPT, image_url)
+        if not result or 'error' in result:
+            raise RuntimeError(f"Image fetch failed: {result.get('error') if result else 'no result'}")
+
+        data = base64.b64decode(result['data'])
+        if not self.check_page_content(file_name, data):
+            return None
+        return self.write_page_file(file_name, data)
+
+    def write_page_file(self, file_name, data):
+        """Write page bytes to <file_name>.png via a temporary file and an atomic rename"""
+        final_path = os.path.join(self.download_path, f"{file_name}.png")
+        temp_path = final_path + '.part'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, final_path)
+        return len(data)
+
+    def get_download_throughput(self):
+        """Return (files per second, bytes per second) for the current transport"""
+        seconds = self.download_stats['seconds']
+        if seconds <= 0:
+            return 0.0, 0.0
+        return self.download_stats['files'] / seconds, self.download_stats['bytes'] / seconds
+
+    def harvest_bulk(self, scroll=True):
+        """Return (position, src) pairs for all rendered pages using one script call"""
+        self.driver_calls += 1
+        if self.use_page_helper:
+            pages = self.call_helper('collectNewSrcs', scroll)
+        else:
+            pages = self.driver.execute_script(HARVEST_SCRIPT, scroll)
+        if pages is None:
+            raise RuntimeError("Virtual scroll wrapper not found")
+        return [tuple(page) for page in pages]
+
+    def harvest_elements(self, wrapper, scroll=True):
+        """Return (position, src, page id) tuples by walking each <li> element (fallback path)"""
+        self.driver_calls += 2
+        ol_element = wrapper.find_element(By.TAG_NAME, "ol")
+        li_elements = ol_element.find_elements(By.TAG_NAME, "li")
+
+        pages = []
+        rendered = []
+        for position, li in enumerate(li_elements):
+            try:
+                self.driver_calls += 3
+                render = li.find_element(By.TAG_NAME, "reader-rendered-page")
+                img = render.find_element(By.TAG_NAME, "img")
+                src_value = img.get_attribute('src')
+                if src_value:
+                    pages.append((position, src_value))
+                    rendered.append(li)
+            except:
+                continue
+
+        # Page-number naming and resume need the reader page id, so read them in one call
+        page_ids = None
+        if rendered:
+            try:
+                self.driver_calls += 1
+                page_ids = self.driver.execute_script(PAGE_IDS_SCRIPT, rendered)
+            except Exception as e:
+                print(f"Error reading page ids: {e}")
+        if page_ids and len(page_ids) == len(pages):
+            pages = [page + (page_id,) for page, page_id in zip(pages, page_ids)]
+
+        # Scroll to load more
+        if scroll and li_elements:
+            self.driver_calls += 1
+            self.driver.execute_script("arguments[0].scrollIntoView();", li_elements[-1])
+
+        return pages
+
+    def invalidate_reader_frame(self):
+        """Forget the cached reader frame so the next cycle re-resolves it"""
+        self._reader_wrapper = None
+        self._observer_ready = False
+
+    def enter_reader_frame(self):
+        """Switch into the reader iframe and return the virtual scroll wrapper"""
+        # The driver stays inside the reader frame between cycles
+        if self.cache_frame and self._reader_wrapper is not None:
+            return self._reader_wrapper
+
+        with self.metrics.timed('frame'):
             # Switch to main window
+            self.driver_calls += 2
             self.driver.switch_to.window(self.driver.window_handles[0])
 
             # Find and switch to iframe
+            self.driver_calls += 2
             iframe = WebDriverWait(self.driver, 5).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "iframe.-gb-display"))
             )
             self.driver.switch_to.frame(iframe)
 
             # Find wrapper element
-            wrapper = WebDriverWait(self.driver, 5).until(
+            self.driver_calls += 1
+            self._reader_wrapper = WebDriverWait(self.driver, 5).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "cdk-virtual-scroll-content-wrapper"))
             )
+            self._observer_ready = False
+            return self._reader_wrapper
 
-            # Find all images
-            ol_element = wrapper.find_element(By.TAG_NAME, "ol")
-            li_elements = ol_element.find_elements(By.TAG_NAME, "li")
+    def set_download_path(self, download_path):
+        """Point the scraper (and a running Chrome) at a new download directory and reset crawl state"""
+        self.download_path = download_path
+        os.makedirs(self.download_path, exist_ok=True)
+
+        self.book_list = SeenIndex(keep_urls=self.book_list.keep_urls)
+        self.current_index = 0
+        self.force_startnum = 0
+        self.download_tracker.download_path = download_path
+        self.manifest = CrawlManifest(download_path)
+        self.manifest_loaded = False
+        self.seen_pages = set()
+        self.retry_pages = {}
+        self.retry_indexes = {}
+        self._pending_records = {}
+        self.fingerprints.clear()
+        self.duplicate_pages = {}
+        self._reader_ids = {}
+        self._page_content = {}
+
+        return self.apply_download_path()
+
+    def apply_download_path(self):
+        """Tell a running Chrome to save downloads into download_path"""
+        if not self.driver:
+            return True
+        try:
+            self.driver.execute_cdp_cmd('Page.setDownloadBehavior', {
+                'behavior': 'allow',
+                'downloadPath': self.download_path
+            })
+            return True
+        except Exception as e:
+            print(f"Error changing Chrome download directory: {e}")
+            return False
+
+    def update_book_id(self):
+        """Take the book id from the reader URL the driver is on"""
+        if not self.driver:
+            return self.book_id
+        try:
+            self.book_id = CrawlManifest.book_id(self.driver.current_url) or self.book_id
+        except Exception as e:
+            print(f"Error reading the reader URL: {e}")
+        return self.book_id
+
+    def load_manifest(self):
+        """Load this book's manifest records so known pages are skipped and indexes continue after them"""
+        self.manifest_loaded = True
+        self.update_book_id()
+        if self.book_id is None:
+            print("Warning: no book id in the reader URL, resuming from every manifest record")
+        records = self.manifest.load(self.book_id)
+        if not records:
+            return 0
+
+        for index in sorted(records):
+            record = records[index]
+            page = record.get('page')
+            finished = record.get('status') in ('done', 'duplicate')
+            if page is None:
+                # Blob URL digests only match within the session that wrote them
+                key = bytes.fromhex(record['digest'])
+                if finished:
+                    self.book_list.add_digest(key)
+                else:
+                    self.retry_indexes[key] = index
+            elif finished:
+                self.seen_pages.add(page)
+                self._reader_ids[index] = page
+                self.retry_pages.pop(page, None)
+            else:
+                self.retry_pages[page] = index
+            if record.get('status') == 'done' and record.get('content'):
+                self.fingerprints.add(index, bytes.fromhex(record['content']))
+
+        self.current_index = max(self.current_index, self.force_startnum, max(records) + 1)
+        print(f"Loaded manifest with {len(records)} pages, next index {self.current_index}")
+        return len(records)
+
+    def record_page(self, file_name, status, size=0, **fields):
+        """Append a manifest record for a pending page"""
+        if file_name not in self._pending_records:
+            return
+        index, key, page = self._pending_records[file_name]
+        if status != 'requested':
+            del self._pending_records[file_name]
+        if not self.use_manifest:
+            return
+        try:
+            self.manifest.append(index, key.hex(), file_name, size, status, book=self.book_id, page=page, **fields)
+        except OSError as e:
+            print(f"Error writing manifest: {e}")
+
+    def on_download_complete(self, file_name, latency):
+        """Fingerprint and record a page confirmed on disk by the download tracker"""
+        path = os.path.join(self.download_path, file_name)
+        fields = self._page_content.pop(file_name, None)
+        if fields is None and file_name in self._pending_records:
+            # Chrome wrote the file, so read it back once to fingerprint it
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = b''
+            if not self.check_page_content(self._pending_records[file_name][0], data):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error removing duplicate {file_name}: {e}")
+                return
+            fields = self._page_content.pop(file_name, {})
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        self.record_page(file_name, 'done', size, **(fields or {}))
+
+    def check_page_content(self, index, data):
+        """Fingerprint page bytes as they land; return False if the page is a dropped duplicate"""
+        # Page-number naming already keys re-rendered pages by page, and blank pages legitimately repeat
+        if self.dedupe_mode == 'off' or self.naming_mode == 'page' or not data:
+            return True
+        file_name = f"{index}.png"
+        with self.metrics.timed('dedupe'):
+            self.fingerprints.window = self.dedupe_window()
+            original, digest = self.fingerprints.match(data, index)
+        if original is None:
+            self.fingerprints.add(index, digest)
+            self._page_content[file_name] = {'content': digest.hex()}
+            return True
+
+        self.duplicate_pages[index] = original
+        reader_id = self._reader_ids.get(index)
+        exact = self.fingerprints.index_of(digest) == original
+        if self.dedupe_mode == 'flag' or not exact or (reader_id is not None and
+                                                       reader_id != self._reader_ids.get(original)):
+            print(f"Page {index} duplicates page {original}")
+            self._page_content[file_name] = {'content': digest.hex(), 'duplicate_of': original}
+            return True
+
+        print(f"Dropping page {index}: duplicate of page {original}")
+        self.download_tracker.cancel(file_name)
+        self.record_page(file_name, 'duplicate', len(data), content=digest.hex(), duplicate_of=original)
+        self.release_index(index)
+        return False
+
+    def is_rerender(self, data, reader_id):
+        """Check whether fetched bytes repeat a page of the dedupe window, before they are given an index"""
+        self.fingerprints.window = self.dedupe_window()
+        with self.metrics.timed('dedupe'):
+            original = self.fingerprints.index_of(self.fingerprints.exact_digest(data))
+        if original is None or not self.fingerprints.in_window(original, max(self.current_index, self.force_startnum)):
+            return False
+        if reader_id is not None and reader_id != self._reader_ids.get(original):
+            return False
+        print(f"Dropping a re-render of page {original}")
+        return True
+
+    def dedupe_window(self):
+        """Return how many indexes back a re-render can land: the downloads in flight plus the scroll look-ahead"""
+        return self.download_tracker.max_in_flight + self.scroll_controller.lookahead
+
+    def release_index(self, index):
+        """Hand a dropped page's index to the next page if no later index was claimed yet"""
+        if self.naming_mode == 'discovery' and index == self.current_index - 1 and index >= self.force_startnum:
+            self.current_index = index
+
+    def claim_index(self, key, page_id=None, reader_id=None, index=None):
+        """Return the file index for a new page digest, or None once stop_index is reached"""
+        if index is not None:
+            last_index = index  # Targeted refetch into a known gap
+        elif page_id is not None:
+            last_index = self.force_startnum + page_id
+            if self.stop_index is not None and last_index >= self.stop_index:
+                self.is_running = False
+                return None
+            self.current_index = max(self.current_index, last_index + 1)
+        elif reader_id in self.retry_pages:
+            last_index = self.retry_pages.pop(reader_id)
+        elif key in self.retry_indexes:
+            last_index = self.retry_indexes.pop(key)
+        else:
+            last_index = max(self.current_index, self.force_startnum)
+            if self.stop_index is not None and last_index >= self.stop_index:
+                self.is_running = False
+                return None
+            self.current_index = last_index + 1  # Next index to be saved
+        self._pending_records[f"{last_index}.png"] = (last_index, key, reader_id)
+        if reader_id is not None:
+            self._reader_ids[last_index] = reader_id
+        return last_index
+
+    def claim_page(self, key, page_id=None, reader_id=None, index=None):
+        """Claim an index for a page and mark its download as requested; None once stop_index is reached"""
+        last_index = self.claim_index(key, page_id, reader_id, index)
+        if last_index is not None:
+            file_name = f"{last_index}.png"
+            self.record_page(file_name, 'requested')
+            self.download_tracker.start(file_name)
+        return last_index
+
+    def page_failed(self, index):
+        """Release the download slot of a failed page and record the failure"""
+        file_name = f"{index}.png"
+        reader_id = self._pending_records.get(file_name, (None, None, None))[2]
+        self.download_tracker.cancel(file_name)
+        self.record_page(file_name, 'failed')
+        if self.target_pages is not None and reader_id is not None:
+            self.target_pages[reader_id] = index
+
+    def note_first_page(self):
+        """Record time-to-first-page for the current driver session"""
+        if self.time_to_first_page is None and self.init_started is not None:
+            self.time_to_first_page = time.perf_counter() - self.init_started
+
+    def download_batch(self, batch, new_images):
+        """Download a batch of (src, index, claim) pages with one WebDriver call
+
+        Entries with index None are claimed only once their bytes are in, passing claim as the
+        claim_index arguments, so a dropped re-render never takes an index.
+        """
+        started = time.perf_counter()
+        self.driver_calls += 1
+        try:
+            with self.metrics.timed('download'):
+                if self.download_mode == 'bytes':
+                    results = self.driver.execute_async_script(FETCH_MANY_SCRIPT, [entry[0] for entry in batch])
+                else:
+                    self.call_helper('downloadMany', [[src, f"{index}.png"] for src, index, claim in batch])
+                    results = None
+        except Exception as e:
+            for src, index, claim in batch:
+                if index is None:
+                    index = self.claim_page(*claim)
+                    if index is None:
+                        break
+                self.page_failed(index)
+            self.metrics.error(len(batch))
+            print(f"Error downloading batch of {len(batch)} pages: {e}")
+            return
+
+        if results is None:
+            self.download_stats['files'] += len(batch)
+            new_images.extend((src, index) for src, index, claim in batch)
+        else:
+            for (src, index, claim), result in zip(batch, results):
+                if index is None:
+                    if result and 'error' not in result and self.is_rerender(base64.b64decode(result['data']), claim[2]):
+                        continue
+                    index = self.claim_page(*claim)
+                    if index is None:
+                        break
+                file_name = f"{index}.png"
+                if not result or 'error' in result:
+                    self.page_failed(index)
+                    self.metrics.error()
+                    print(f"Error downloading {file_name}: {result.get('error') if result else 'no result'}")
+                    continue
+                data = base64.b64decode(result['data'])
+                if not self.check_page_content(index, data):
+                    continue
+                size = self.write_page_file(index, data)
+                self.download_tracker.complete(file_name)
+                self.download_stats['files'] += 1
+                self.download_stats['bytes'] += size
+                new_images.append((src, index))
+        self.download_stats['seconds'] += time.perf_counter() - started
+        if new_images:
+            self.note_first_page()
+
+    def process_pages(self, pages):
+        """Download pages whose src has not been seen yet and return (src, index) pairs"""
+        new_images = []
+        batch = []
+        batched = self.use_page_helper or self.download_mode == 'bytes'
+        for page in pages:
+            src_value = page[1]
+            reader_id = page[2] if len(page) > 2 else None
+            page_id = reader_id if self.naming_mode == 'page' else None
+            if self.naming_mode == 'page' and page_id is None:
+                continue  # A discovery-order index would collide with page-numbered files
+            if page_id is not None and self.start_page is not None and page_id < self.start_page:
+                continue
+            if page_id is not None:
+                # A re-rendered page gets a new blob URL but keeps its page number
+                key = self.book_list.digest(f"page:{page_id}")
+            else:
+                key = self.book_list.digest(src_value)
+            target_index = None
+            if self.target_pages is not None:
+                # Targeted refetch: only wanted pages, even if they were seen before
+                if reader_id not in self.target_pages:
+                    continue
+                target_index = self.target_pages.pop(reader_id)
+            elif self.book_list.has_digest(key) or reader_id in self.seen_pages:
+                continue
+            governed = self.use_rate_governor and self.target_pages is None
+            # Queued batch entries cannot complete until they are sent
+            if batch and (self.download_tracker.poll() >= self.download_tracker.max_in_flight or
+                          len(batch) >= self.download_tracker.max_in_flight or
+                          (governed and not self.rate_governor.available())):
+                self.download_batch(batch, new_images)
+                batch = []
+            if governed:
+                with self.metrics.timed('governor'):
+                    if not self.rate_governor.acquire(lambda: self.is_running):
+                        break
+            with self.metrics.timed('backpressure'):
+                has_slot = self.download_tracker.wait_for_slot(lambda: self.is_running)
+            if not has_slot:
+                break
+            self.book_list.add_digest(key, src_value)
+            if reader_id is not None:
+                self.seen_pages.add(reader_id)
+
+            if (self.dedupe_mode == 'remove' and self.download_mode == 'bytes' and batched
+                    and page_id is None and target_index is None):
+                # Claimed after the bytes are fingerprinted, in batch order
+                batch.append((src_value, None, (key, page_id, reader_id)))
+                continue
+
+            last_index = self.claim_page(key, page_id, reader_id, target_index)
+            if last_index is None:
+                break
+
+            if batched:
+                batch.append((src_value, last_index, None))
+                continue
+            file_name = f"{last_index}.png"
+
+            self.driver_calls += 1
+            try:
+                with self.metrics.timed('download'):
+                    size = self.download_image(src_value, last_index)
+            except Exception as e:
+                self.page_failed(last_index)
+                self.metrics.error()
+                print(f"Error downloading {file_name}: {e}")
+                continue
+            if size is None:
+                continue
+            if self.download_mode == 'bytes':
+                self.download_tracker.complete(file_name)
+            new_images.append((src_value, last_index))
+            self.note_first_page()
+
+        if batch:
+            self.download_batch(batch, new_images)
+        return new_images
+
+    def scrape_current_page(self, scroll=True):
+        """Scrape images from current page"""
+        self.driver_calls = 0
+        try:
+            wrapper = self.enter_reader_frame()
+
+            with self.metrics.timed('harvest'):
+                pages = None
+                if self.harvest_mode == 'bulk':
+                    try:
+                        pages = self.harvest_bulk(scroll)
+                    except Exception as e:
+                        self.metrics.error()
+                        print(f"Bulk harvest failed, falling back to element walk: {e}")
+                if pages is None:
+                    pages = self.harvest_elements(wrapper, scroll)
+            self.visible_page_ids = [page[2] for page in pages if len(page) > 2 and page[2] is not None]
+
+            return wrapper, self.process_pages(pages)
+
+        except Exception as e:
+            # Stale element, lost frame or navigation: resolve the frame again next cycle
+            self.invalidate_reader_frame()
+            self.metrics.error()
+            print(f"Error scraping page: {e}")
+            return None, []
+        finally:
+            self.last_cycle_driver_calls = self.driver_calls
+
+    def scrape_observed(self):
+        """Block until the page observer reports new images, then download them"""
+        self.driver_calls = 0
+        try:
+            wrapper = self.enter_reader_frame()
+
+            if not self._observer_ready:
+                self.driver_calls += 1
+                if not self.driver.execute_script(OBSERVER_INSTALL_SCRIPT):
+                    raise RuntimeError("Virtual scroll wrapper not found")
+                self._observer_ready = True
+
+            timeout_ms = int(self.observe_timeout * 1000)
+            with self.metrics.timed('wait'):
+                if self._script_timeout != self.observe_timeout + 5:
+                    self.driver_calls += 1
+                    self._script_timeout = self.observe_timeout + 5
+                    self.driver.set_script_timeout(self._script_timeout)
+                self.driver_calls += 1
+                pages = self.driver.execute_async_script(OBSERVER_DRAIN_SCRIPT, timeout_ms)
+            if pages is None:
+                self.invalidate_reader_frame()
+                return None, []
+
+            return wrapper, self.process_pages(pages)
+
+        except Exception as e:
+            # Stale element, lost frame or navigation: resolve the frame again next cycle
+            self.invalidate_reader_frame()
+            self.metrics.error()
+            print(f"Error scraping page: {e}")
+            return None, []
+        finally:
+            self.last_cycle_driver_calls = self.driver_calls
+
+    def scrape_network(self):
+        """Save page images captured from network responses since the last cycle"""
+        self.driver_calls = 0
+        try:
+            wrapper = self.enter_reader_frame()
+
+            self.driver_calls += 1
+            with self.metrics.timed('harvest'):
+                finished = self.network_capture.poll()
 
             new_images = []
-            for li in li_elements:
+            for request_id, url in finished:
+                page_id = self.network_capture.page_id(url)
+                key = self.book_list.digest(f"page:{page_id}")
+                if self.book_list.has_digest(key) or page_id in self.seen_pages:
+                    continue
+                if self.use_rate_governor:
+                    with self.metrics.timed('governor'):
+                        if not self.rate_governor.acquire(lambda: self.is_running):
+                            break
+                self.driver_calls += 1
                 try:
-                    render = li.find_element(By.TAG_NAME, "reader-rendered-page")
-                    img = render.find_element(By.TAG_NAME, "img")
-                    src_value = img.get_attribute('src')
-
-                    if src_value and src_value not in self.book_list:
-                        self.book_list.append(src_value)
-                        last_index = len(self.book_list) - 1 + self.force_startnum
-                        self.current_index = last_index + 1  # Next index to be saved
-                        self.download_image(src_value, last_index)
-                        new_images.append((src_value, last_index))
-                except:
+                    with self.metrics.timed('download'):
+                        data = self.network_capture.fetch_body(request_id)
+                except Exception as e:
+                    self.metrics.error()
+                    print(f"Error reading response body for {url}: {e}")
+                    continue
+                self.book_list.add_digest(key, url)
+                self.seen_pages.add(page_id)
+
+                # Responses arrive in any order, so files are numbered by the page id in the URL
+                last_index = self.claim_index(key, page_id, page_id)
+                if last_index is None:
+                    break
+                file_name = f"{last_index}.png"
+                if not self.check_page_content(last_index, data):
                     continue
 
-            # Scroll to load more
-            if li_elements:
-                self.driver.execute_script("arguments[0].scrollIntoView();", li_elements[-1])
+                started = time.perf_counter()
+                size = self.write_page_file(last_index, data)
+                elapsed = time.perf_counter() - started
+                self.metrics.add('download', elapsed)
+                self.download_stats['files'] += 1
+                self.download_stats['bytes'] += size
+                self.download_stats['seconds'] += elapsed
+                self.record_page(file_name, 'done', size, **self._page_content.pop(file_name, {}))
+                new_images.append((url, last_index))
 
+            if new_images:
+                self.note_first_page()
             return wrapper, new_images
 
         except Exception as e:
-            print(f"Error scraping page: {e}")
+            self.invalidate_reader_frame()
+            self.metrics.error()
+            print(f"Error capturing pages: {e}")
             return None, []
+        finally:
+            self.last_cycle_driver_calls = self.driver_calls
+
+    def scroll_ahead(self, pages):
+        """Scroll the reader forward by a number of pages"""
+        try:
+            self.driver_calls += 1
+            with self.metrics.timed('scroll'):
+                if self.use_page_helper:
+                    return self.call_helper('scrollAhead', pages) is not None
+                return self.driver.execute_script(SCROLL_AHEAD_SCRIPT, pages) is not None
+        except Exception as e:
+            print(f"Error scrolling ahead: {e}")
+            return False
+
+    def seek_to_page(self, page, attempts=5):
+        """Scroll the reader so that the given page offset is in view"""
+        for attempt in range(attempts):
+            try:
+                self.enter_reader_frame()
+                if self.use_page_helper:
+                    result = self.call_helper('seek', page)
+                else:
+                    result = self.driver.execute_script(SEEK_SCRIPT, page)
+                if result is not None:
+                    return True
+            except Exception as e:
+                print(f"Seek to page {page} failed (attempt {attempt + 1}): {e}")
+            time.sleep(2)
+        return False
+
+    def reset_page_helper(self):
+        """Make the page helper report every rendered page again"""
+        if not self.use_page_helper or not self.driver:
+            return
+        try:
+            self.enter_reader_frame()
+            self.call_helper('resetSeen')
+        except Exception as e:
+            self.invalidate_reader_frame()
+            print(f"Error resetting page helper: {e}")
+
+    def reader_pages_for(self, indexes):
+        """Return {reader page id: index} for the indexes whose reader page is known"""
+        self.update_book_id()
+        records = self.manifest.load(self.book_id) if self.use_manifest else {}
+        known = sorted((index, record['page']) for index, record in records.items()
+                       if record.get('page') is not None)
+        positions = [index for index, page in known]
+
+        pages = {}
+        for index in indexes:
+            slot = bisect.bisect_left(positions, index)
+            if slot < len(known) and known[slot][0] == index:
+                page = known[slot][1]
+            elif 0 < slot < len(known) and known[slot][1] - known[slot - 1][1] == known[slot][0] - known[slot - 1][0]:
+                # The neighbours were saved one file per reader page, so the gap lies between them
+                page = known[slot - 1][1] + index - known[slot - 1][0]
+            elif self.naming_mode == 'page':
+                page = index - self.force_startnum
+            else:
+                continue
+            pages[page] = index
+        return pages
+
+    def refetch_pages(self, indexes, callback=None, timeout_per_page=20):
+        """Seek to the reader page of each missing index and download only those pages; return indexes still missing"""
+        targets = self.reader_pages_for(indexes)
+        unmapped = sorted(set(indexes) - set(targets.values()))
+        if unmapped:
+            print(f"Warning: no reader page recorded for indexes {unmapped}, not refetching them")
+        self.target_pages = dict(targets)
+        self.is_running = True
+        self.reset_page_helper()
+
+        # Chrome would save N (1).png next to an existing N.png, and the tracker would take the
+        # old partial file for the new download, so every existing target is moved aside first
+        set_aside = {}
+        for index in targets.values():
+            path = os.path.join(self.download_path, f"{index}.png")
+            if os.path.isfile(path):
+                try:
+                    os.replace(path, path + '.refetch')
+                    set_aside[index] = path
+                except OSError as e:
+                    print(f"Error moving aside {index}.png: {e}")
+
+        try:
+            for page in sorted(targets):
+                if not self.is_running:
+                    break
+                if page not in self.target_pages:
+                    continue  # Already fetched together with a neighbouring page
+                if not self.seek_to_page(page):
+                    continue
+
+                deadline = time.monotonic() + timeout_per_page
+                while page in self.target_pages and self.is_running and time.monotonic() < deadline:
+                    wrapper, new_images = self.scrape_current_page(scroll=False)
+                    if callback and new_images:
+                        callback(new_images)
+                    if page in self.target_pages:
+                        visible = self.visible_page_ids
+                        if visible and not min(visible) <= page <= max(visible):
+                            # Pages of another height skewed the pitch; measured here it is closer
+                            self.seek_to_page(page)
+                        time.sleep(0.25)
+
+            self.download_tracker.wait_all(timeout=self.download_tracker.stall_timeout)
+        finally:
+            remaining = sorted(set(self.target_pages.values()) | set(unmapped))
+            self.target_pages = None
+            self.is_running = False
+            for index, path in set_aside.items():
+                # Keep the old copy only when nothing better arrived
+                try:
+                    if os.path.isfile(path) and os.path.getsize(path) > 0:
+                        os.remove(path + '.refetch')
+                    else:
+                        os.replace(path + '.refetch', path)
+                except OSError as e:
+                    print(f"Error restoring {index}.png: {e}")
+        return remaining
+
+    def update_rate_governor(self, new_images):
+        """Feed one cycle's failures, empty renders and fetch latency to the rate governor"""
+        pages = len(new_images)
+        latency = self.metrics.stage_seconds('download') / pages if pages else None
+        # Pages were requested by scrolling but none of them rendered
+        empty = not pages and self.scroll_controller.outstanding > 0
+        reason = self.rate_governor.record_cycle(pages, self.metrics.current_errors(), latency, empty)
+        if reason:
+            print(f"Rate governor backed off ({reason}): {self.rate_governor.pages_per_minute():.0f} pages/min")
+        return reason
+
+    def get_pages_per_minute(self):
+        """Return pages/minute observed by the scroll controller"""
+        return self.scroll_controller.pages_per_minute()
 
     def start_scraping(self, callback=None):
         """Start continuous scraping"""
         self.is_running = True
+        self.reached_end = False
+        if self.use_manifest and not self.manifest_loaded:
+            self.load_manifest()
+        self.reset_page_helper()
 
+        last_new_page = time.monotonic()
         while self.is_running:
-            wrapper, new_images = self.scrape_current_page()
+            self.metrics.begin_cycle()
+            new_images = []
+            backoff = None
+            try:
+                if self.capture_mode == 'network':
+                    wrapper, new_images = self.scrape_network()
+                elif self.discovery_mode == 'observe':
+                    wrapper, new_images = self.scrape_observed()
+                else:
+                    # The scroll controller below decides how far to scroll
+                    wrapper, new_images = self.scrape_current_page(scroll=False)
 
-            if callback and new_images:
-                callback(new_images)
+                if callback and new_images:
+                    callback(new_images)
 
-            time.sleep(2)
+                if new_images:
+                    last_new_page = time.monotonic()
+                elif self.idle_timeout is not None and time.monotonic() - last_new_page > self.idle_timeout:
+                    self.reached_end = True
+                    self.is_running = False
+                    break
+
+                if wrapper is None:
+                    with self.metrics.timed('sleep'):
+                        time.sleep(2)
+                    continue
+
+                controller = self.scroll_controller
+                if self.use_rate_governor:
+                    backoff = self.update_rate_governor(new_images)
+                controller.record_cycle(len(new_images))
+                step = controller.next_step()
+                if step and self.scroll_ahead(step):
+                    controller.record_scroll(step)
+                self.last_cycle_driver_calls = self.driver_calls
+
+                # The observer drain already blocks until pages arrive
+                if self.discovery_mode != 'observe' or self.capture_mode == 'network':
+                    with self.metrics.timed('sleep'):
+                        time.sleep(controller.delay)
+            finally:
+                rate = self.rate_governor.rate if self.use_rate_governor else None
+                self.metrics.end_cycle(len(new_images), driver_calls=self.driver_calls, rate=rate, backoff=backoff)
+
+        # Let pending downloads land so the manifest records them as done
+        self.download_tracker.wait_all(timeout=self.download_tracker.stall_timeout)
 
     def stop_scraping(self):
         """Stop scraping"""
@@ -261,6 +1467,11 @@ class GoogleBooksScraper:
 
     def close(self):
         """Close driver"""
+        self.invalidate_reader_frame()
+        self._script_timeout = None
         if self.driver:
-            self.driver.quit()
+            if self.driver_pool:
+                self.driver_pool.release(self.driver)
+            else:
+                self.driver.quit()
             self.driver = None
\ No newline at end of file
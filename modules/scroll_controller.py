@@ -0,0 +1,67 @@
+"""
+Adaptive scroll-ahead controller for the reader's virtual scroll list
+"""
+
+import time
+
+
+class ScrollController:
+    def __init__(self, lookahead=6, min_delay=0.25, max_delay=2.0):
+        self.lookahead = lookahead  # Max pages requested but not yet rendered
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+        self.step = 1  # Pages to scroll per request
+        self.delay = max_delay  # Seconds to wait between cycles
+        self.render_latency = None  # Smoothed seconds from scroll request to new pages
+        self.outstanding = 0
+        self.total_pages = 0
+        self.started = None
+        self._requested_at = None
+
+    def next_step(self):
+        """Return how many pages to scroll ahead now (0 when the lookahead window is full)"""
+        return max(0, min(self.step, self.lookahead - self.outstanding))
+
+    def record_scroll(self, pages):
+        """Record that pages were requested by scrolling"""
+        self.outstanding += pages
+        if self._requested_at is None:
+            self._requested_at = time.monotonic()
+
+    def record_cycle(self, new_pages):
+        """Update step size and pacing from the pages found in one cycle"""
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        self.total_pages += new_pages
+
+        if new_pages:
+            self.outstanding = max(0, self.outstanding - new_pages)
+            if self._requested_at is not None:
+                latency = now - self._requested_at
+                if self.render_latency is None:
+                    self.render_latency = latency
+                else:
+                    self.render_latency = 0.7 * self.render_latency + 0.3 * latency
+                self._requested_at = None
+
+            # Everything requested arrived: ask for more at once and poll sooner
+            if new_pages >= self.step:
+                self.step = min(self.step + 1, self.lookahead)
+                self.delay = max(self.min_delay, self.delay * 0.7)
+        else:
+            # Nothing rendered: back off and re-request from scratch
+            self.step = max(1, self.step // 2)
+            self.delay = min(self.max_delay, self.delay * 1.5)
+            self.outstanding = 0
+            self._requested_at = None
+
+    def pages_per_minute(self):
+        """Return the observed crawl rate"""
+        if self.started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        if elapsed <= 0:
+            return 0.0
+        return self.total_pages * 60.0 / elapsed
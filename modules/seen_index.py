@@ -0,0 +1,55 @@
+"""
+Insertion-ordered index of page URLs that have already been seen
+"""
+
+import hashlib
+
+
+class SeenIndex:
+    def __init__(self, keep_urls=True, digest_size=8):
+        # keep_urls=False is the bounded-memory mode: only digests are stored
+        self.keep_urls = keep_urls
+        self.digest_size = digest_size
+        self._order = {}  # digest -> insertion position
+        self._urls = []
+
+    def digest(self, url):
+        """Return the compact hashed key for a URL"""
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=self.digest_size).digest()
+
+    def add(self, url):
+        """Add a URL and return its position, or None if it was already seen"""
+        return self.add_digest(self.digest(url), url)
+
+    def add_digest(self, key, url=None):
+        """Add a precomputed digest and return its position, or None if already seen"""
+        if key in self._order:
+            return None
+        position = len(self._order)
+        self._order[key] = position
+        if self.keep_urls:
+            self._urls.append(url)
+        return position
+
+    def has_digest(self, key):
+        """Check whether a precomputed digest has been seen"""
+        return key in self._order
+
+    def position(self, url):
+        """Return the insertion position of a URL, or None if unseen"""
+        return self._order.get(self.digest(url))
+
+    def clear(self):
+        """Forget every seen URL"""
+        self._order.clear()
+        self._urls.clear()
+
+    def __contains__(self, url):
+        return self.digest(url) in self._order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        """Iterate over stored URLs in insertion order (empty in bounded mode)"""
+        return iter(self._urls)
@@ -35,7 +35,8 @@ class SettingsManager:
         self.config['Converter'] = {
             'directory': os.path.join(os.getcwd(), 'Downloads'),
             'jpeg_output': '',
-            'apply_sharpness': 'True'
+            'apply_sharpness': 'True',
+            'workers': '0'
         }
 
         # Reorder settings
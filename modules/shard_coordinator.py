@@ -0,0 +1,121 @@
+"""
+Coordinator that crawls one book with several Chrome instances in parallel
+"""
+
+import os
+import threading
+
+from .scraper import GoogleBooksScraper
+from .driver_pool import clone_profile
+
+
+class ShardCoordinator:
+    def __init__(self, book_url, download_path, total_pages, shard_count=2,
+                 profile_dir=None, window_size=None, scraper_options=None, idle_timeout=60):
+        self.book_url = book_url
+        self.download_path = download_path
+        self.total_pages = total_pages
+        self.shard_count = max(1, shard_count)
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), 'chrome_profile')
+        self.window_size = window_size
+        self.scraper_options = scraper_options or {}  # Attributes applied to every shard scraper
+        self.idle_timeout = idle_timeout  # Ends a shard that finds no new page, e.g. past an overestimated end
+
+        self.scrapers = []
+        self.threads = []
+
+    def plan_ranges(self):
+        """Split the book into contiguous (start, end) page ranges, end exclusive"""
+        ranges = []
+        per_shard, extra = divmod(self.total_pages, self.shard_count)
+        start = 0
+        for shard in range(self.shard_count):
+            end = start + per_shard + (1 if shard < extra else 0)
+            if end > start:
+                ranges.append((start, end))
+            start = end
+        return ranges
+
+    def shard_path(self, shard):
+        """Return the download directory for one shard"""
+        return os.path.join(self.download_path, f"shard_{shard}")
+
+    def clone_profile(self, shard):
+        """Copy the logged-in Chrome profile so each instance gets its own user-data-dir"""
+        return clone_profile(self.profile_dir, f"{self.profile_dir}_shard{shard}")
+
+    def launch(self, callback=None, headless=False):
+        """Start one driver per shard, open the book and seek to each shard's offset"""
+        for shard, (start, end) in enumerate(self.plan_ranges()):
+            scraper = GoogleBooksScraper(self.shard_path(shard), use_profile=True,
+                                         profile_dir=self.clone_profile(shard))
+            scraper.idle_timeout = self.idle_timeout
+            for name, value in self.scraper_options.items():
+                setattr(scraper, name, value)
+            # Seeking is approximate, so files are named by reader page id rather than discovery order
+            scraper.naming_mode = 'page'
+            scraper.force_startnum = 0
+            scraper.current_index = start
+            scraper.start_page = start  # A seek that lands early must not repeat the previous shard's tail
+            scraper.stop_index = end
+
+            position = None
+            if self.window_size:
+                position = (shard * 40, shard * 40)
+            if not scraper.init_driver(window_size=self.window_size, window_position=position, headless=headless):
+                raise RuntimeError(f"Failed to start driver for shard {shard}")
+            scraper.navigate_to_book(self.book_url)
+            if start and not scraper.seek_to_page(start):
+                print(f"Shard {shard} could not seek to page {start}")
+
+            self.scrapers.append(scraper)
+            if callback:
+                callback(f"Shard {shard} ready for pages {start}-{end - 1}")
+
+    def run(self, callback=None):
+        """Crawl all shards concurrently and block until every shard has finished"""
+        for scraper in self.scrapers:
+            thread = threading.Thread(target=scraper.start_scraping, args=(callback,))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def stop(self):
+        """Stop every shard"""
+        for scraper in self.scrapers:
+            scraper.stop_scraping()
+
+    def merge(self, callback=None):
+        """Move shard outputs into the download directory by reader page id; the lowest shard wins on overlaps"""
+        moved = 0
+        duplicates = 0
+        for shard in range(len(self.scrapers)):
+            shard_dir = self.shard_path(shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for filename in os.listdir(shard_dir):
+                page = filename[:-4]
+                source = os.path.join(shard_dir, filename)
+                if not filename.endswith('.png') or not page.isdigit() or os.path.getsize(source) == 0:
+                    continue
+                # Shards name files by reader page id, so equal names are the same page
+                target = os.path.join(self.download_path, f"{int(page)}.png")
+                if os.path.isfile(target) and os.path.getsize(target) > 0:
+                    duplicates += 1
+                    continue
+                os.replace(source, target)
+                moved += 1
+
+        if callback:
+            callback(f"Merged {moved} pages ({duplicates} overlapping pages skipped)")
+        return moved, duplicates
+
+    def close(self):
+        """Close every shard driver"""
+        for scraper in self.scrapers:
+            scraper.close()
+        self.scrapers = []
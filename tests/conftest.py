@@ -0,0 +1,37 @@
+"""
+Shared fixtures: scrapers crawling a synthetic book through the fake WebDriver
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.scraper import GoogleBooksScraper
+from bench.fake_driver import FakeDriver, SyntheticBook
+
+
+def page_files(directory):
+    """Return the sorted indexes of the numbered PNG files in a directory"""
+    return sorted(int(name[:-4]) for name in os.listdir(directory)
+                  if name.endswith('.png') and name[:-4].isdigit())
+
+
+@pytest.fixture
+def make_scraper(tmp_path):
+    """Return a factory for fast offline scrapers over a synthetic book"""
+    def factory(book=None, download_path=None, **options):
+        download_path = str(download_path or tmp_path / 'pages')
+        scraper = GoogleBooksScraper(download_path, use_profile=False)
+        scraper.discovery_mode = 'observe'
+        scraper.download_mode = 'bytes'
+        scraper.observe_timeout = 0.2
+        scraper.idle_timeout = 0.6
+        scraper.use_rate_governor = False
+        for name, value in options.items():
+            setattr(scraper, name, value)
+        scraper.driver = FakeDriver(book or SyntheticBook(20, 8, 0.0), download_path)
+        return scraper
+    return factory
@@ -0,0 +1,36 @@
+"""
+End-to-end crawls of a synthetic book through the fake WebDriver
+"""
+
+import pytest
+
+from conftest import page_files
+
+
+@pytest.mark.parametrize('download_mode', ['bytes', 'browser'])
+def test_crawl_saves_every_page_once(make_scraper, download_mode):
+    scraper = make_scraper(download_mode=download_mode)
+    scraper.start_scraping()
+
+    assert scraper.reached_end
+    assert page_files(scraper.download_path) == list(range(20))
+
+
+def test_page_naming_survives_a_failed_bulk_harvest(make_scraper):
+    scraper = make_scraper(discovery_mode='poll', naming_mode='page', idle_timeout=3)
+    harvest_bulk = scraper.harvest_bulk
+    calls = [0]
+
+    def flaky_harvest(scroll=True):
+        calls[0] += 1
+        if calls[0] == 3:
+            raise RuntimeError("transient harvest failure")
+        return harvest_bulk(scroll)
+
+    scraper.harvest_bulk = flaky_harvest
+    saved = []
+    scraper.start_scraping(lambda images: saved.extend(index for src, index in images))
+
+    assert calls[0] > 3
+    assert sorted(saved) == list(range(20))
+    assert page_files(scraper.download_path) == list(range(20))
@@ -0,0 +1,54 @@
+"""
+Content dedupe of pages whose images genuinely repeat
+"""
+
+import pytest
+
+from conftest import page_files
+from bench.fake_driver import SyntheticBook
+
+
+def repeating_book():
+    """Return a book whose pages 12 and 30 show the same image as page 10"""
+    book = SyntheticBook(40, 8, 0.0)
+    book.content = {12: 10, 30: 10}
+    return book
+
+
+def test_repeats_are_flagged_only_inside_the_window(make_scraper):
+    scraper = make_scraper(repeating_book())
+    assert scraper.dedupe_mode == 'flag'
+    scraper.start_scraping()
+
+    assert page_files(scraper.download_path) == list(range(40))
+    assert scraper.duplicate_pages == {12: 10}
+
+
+@pytest.mark.parametrize('download_mode', ['bytes', 'browser'])
+def test_remove_keeps_distinct_pages_with_equal_images(make_scraper, download_mode):
+    scraper = make_scraper(repeating_book(), dedupe_mode='remove', download_mode=download_mode)
+    scraper.start_scraping()
+
+    assert page_files(scraper.download_path) == list(range(40))
+
+
+def test_remove_drops_rerenders_without_page_ids(make_scraper):
+    book = SyntheticBook(20, 8, 0.0)
+    scraper = make_scraper(book, dedupe_mode='remove', discovery_mode='poll', idle_timeout=3)
+    harvest_bulk = scraper.harvest_bulk
+    calls = [0]
+
+    def harvest_without_ids(scroll=True):
+        calls[0] += 1
+        if calls[0] == 3:
+            # The reader renders the pages in view again under new blob URLs
+            for page in book.visible_pages():
+                book.rerender(page)
+        return [page[:2] + (None,) for page in harvest_bulk(scroll)]
+
+    scraper.harvest_bulk = harvest_without_ids
+    scraper.start_scraping()
+
+    assert any(book.generation.values())
+    assert page_files(scraper.download_path) == list(range(20))
+    assert not scraper.duplicate_pages
@@ -0,0 +1,111 @@
+"""
+Incremental rebuilds of the converter stages through the build cache
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from modules.build_cache import BuildCache
+from modules.image_converter import ImageConverter
+
+
+def write_image(path, shade, image_format='PNG'):
+    """Write a small solid image in the given format"""
+    Image.new('RGB', (8, 8), (shade, shade, 255 - shade)).save(path, image_format)
+
+
+@pytest.fixture
+def pages(tmp_path):
+    """Return a directory with three PNG pages"""
+    directory = tmp_path / 'pages'
+    directory.mkdir()
+    for index in range(3):
+        write_image(directory / f"{index}.png", index * 40)
+    return str(directory)
+
+
+def test_touched_but_unchanged_input_stays_fresh(pages, tmp_path):
+    output = str(tmp_path / 'out.bin')
+    with open(output, 'wb') as f:
+        f.write(b'built')
+    cache = BuildCache(pages)
+    cache.record('stage', '0.png', {'a': 1}, output)
+    cache.save()
+
+    stat = os.stat(os.path.join(pages, '0.png'))
+    os.utime(os.path.join(pages, '0.png'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cache = BuildCache(pages)
+    assert cache.is_fresh('stage', '0.png', {'a': 1}, output)
+    assert not cache.is_fresh('stage', '0.png', {'a': 2}, output)
+
+    write_image(os.path.join(pages, '0.png'), 200)
+    assert not BuildCache(pages).is_fresh('stage', '0.png', {'a': 1}, output)
+
+
+def test_jpeg_stage_rebuilds_only_what_changed(pages, tmp_path):
+    output = str(tmp_path / 'jpeg')
+    converter = ImageConverter(workers=1)
+    assert converter.convert_png_to_jpeg(pages, output) == 3
+    assert converter.convert_png_to_jpeg(pages, output) == 0
+
+    # A replaced output is rebuilt
+    write_image(os.path.join(output, '1.jpg'), 7, 'JPEG')
+    assert converter.convert_png_to_jpeg(pages, output) == 1
+
+    # A parameter change or force rebuilds everything
+    assert converter.convert_png_to_jpeg(pages, output, apply_sharpness=False) == 3
+    assert converter.convert_png_to_jpeg(pages, output, apply_sharpness=False) == 0
+    assert converter.convert_png_to_jpeg(pages, output, apply_sharpness=False, force=True) == 3
+
+
+def test_jpeg_stage_on_a_process_pool_records_worker_hashes(pages, tmp_path):
+    output = str(tmp_path / 'jpeg')
+    assert ImageConverter(workers=2, chunk_size=1).convert_png_to_jpeg(pages, output) == 3
+    cache = BuildCache(pages)
+    assert cache.stages['jpeg']['2.png']['hash'] == BuildCache.file_hash(os.path.join(pages, '2.png'))
+    assert ImageConverter(workers=2, chunk_size=1).convert_png_to_jpeg(pages, output) == 0
+
+
+def test_png_stage_skips_genuine_and_up_to_date_files(pages):
+    write_image(os.path.join(pages, '3.jpg'), 90, 'JPEG')
+    write_image(os.path.join(pages, '4.png'), 120, 'JPEG')  # Misnamed JPEG
+    converter = ImageConverter(workers=1)
+
+    file_count, converted, misnamed, skipped = converter.convert_to_png(pages)
+    assert (file_count, converted, misnamed, skipped) == (5, 2, ['4.png'], 3)
+    with open(os.path.join(pages, '4.png'), 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    file_count, converted, misnamed, skipped = converter.convert_to_png(pages)
+    assert (file_count, converted, misnamed, skipped) == (6, 0, [], 6)
+    assert converter.convert_to_png(pages, force=True)[1] == 1
+
+
+def test_pdf_is_rebuilt_after_a_page_is_added(pages, tmp_path):
+    output = str(tmp_path / 'book.pdf')
+    converter = ImageConverter(workers=1)
+    messages = []
+
+    def callback(message, *progress):
+        messages.append(message)
+
+    assert converter.convert_to_pdf(pages, output, callback=callback)
+    assert converter.convert_to_pdf(pages, output, callback=callback)
+    assert messages[-1] == f"PDF is up to date: {output}"
+
+    write_image(os.path.join(pages, '3.png'), 99)
+    assert converter.convert_to_pdf(pages, output, callback=callback)
+    assert messages[-1] == f"PDF created: {output}"
+    assert BuildCache(pages).names('pdf') == {'0.png', '1.png', '2.png', '3.png'}
+
+
+def test_recording_reuses_the_hash_of_the_bytes_already_read(pages, tmp_path, monkeypatch):
+    def file_hash(path):
+        raise AssertionError(f"{path} was read again to hash it")
+
+    monkeypatch.setattr(BuildCache, 'file_hash', staticmethod(file_hash))
+    converter = ImageConverter(workers=1)
+    assert converter.convert_png_to_jpeg(pages, str(tmp_path / 'jpeg')) == 3
+    assert converter.convert_to_pdf(pages, str(tmp_path / 'book.pdf'))
@@ -0,0 +1,40 @@
+"""
+Unattended crawls through the job queue and its command line
+"""
+
+import os
+
+from conftest import page_files
+from modules.job_queue import DONE, BatchCrawler, JobQueue, main
+
+BOOK_URL = 'https://play.google.com/books/reader?id=fake'
+
+
+def test_cli_queues_books_by_book_id(tmp_path, capsys):
+    queue_file = str(tmp_path / 'jobs.json')
+    downloads = str(tmp_path / 'Downloads')
+    assert main(['--queue-file', queue_file, '--downloads', downloads, 'add', BOOK_URL, BOOK_URL]) == 0
+    assert main(['--queue-file', queue_file, '--downloads', downloads, 'list']) == 0
+
+    jobs = JobQueue(queue_file, downloads).jobs
+    assert len(jobs) == 1
+    assert jobs[0]['download_path'] == os.path.join(downloads, 'fake')
+    assert '1 pending' in capsys.readouterr().out
+
+
+def test_batch_crawler_finishes_a_book_and_fills_its_gaps(tmp_path, make_scraper):
+    queue = JobQueue(str(tmp_path / 'jobs.json'), str(tmp_path / 'Downloads'))
+    job = queue.add_job(BOOK_URL)
+    scraper = make_scraper()
+    scraper.driver.broken_pages = {5}
+    refetch_pages = scraper.refetch_pages
+
+    def refetch_after_recovery(*args, **kwargs):
+        scraper.driver.broken_pages.clear()
+        return refetch_pages(*args, **kwargs)
+
+    scraper.refetch_pages = refetch_after_recovery
+    BatchCrawler(queue, scraper, idle_timeout=0.6).run()
+
+    assert queue.jobs[0]['state'] == DONE
+    assert page_files(job['download_path']) == list(range(20))
@@ -0,0 +1,26 @@
+"""
+Cycle numbering and percentiles of the crawl metrics
+"""
+
+import pytest
+
+from modules.crawl_metrics import CrawlMetrics
+
+
+@pytest.mark.parametrize('count, fraction, expected', [
+    (6, 0.5, 3),
+    (20, 0.95, 19),
+    (20, 0.5, 10),
+    (1, 0.95, 1),
+    (10, 1.0, 10),
+])
+def test_percentile_is_nearest_rank(count, fraction, expected):
+    assert CrawlMetrics.percentile(list(range(count, 0, -1)), fraction) == expected
+
+
+def test_cycles_keep_counting_past_the_kept_records():
+    metrics = CrawlMetrics(max_cycles=3)
+    for _ in range(5):
+        metrics.begin_cycle()
+        metrics.end_cycle()
+    assert [cycle['cycle'] for cycle in metrics.cycles] == [3, 4, 5]
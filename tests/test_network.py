@@ -0,0 +1,21 @@
+"""
+Page capture from DevTools network responses
+"""
+
+import os
+
+from conftest import page_files
+from modules.network_capture import NetworkCapture
+
+
+def test_network_capture_numbers_pages_by_page_id(make_scraper):
+    scraper = make_scraper(capture_mode='network', discovery_mode='poll')
+    scraper.network_capture = NetworkCapture(scraper.driver)
+    scraper.network_capture.enable()
+    scraper.driver.cached_pages = {3, 4}  # A book opened before in this profile
+    scraper.start_scraping()
+
+    assert page_files(scraper.download_path) == list(range(20))
+    for index in range(20):
+        with open(os.path.join(scraper.download_path, f"{index}.png"), 'rb') as f:
+            assert f.read() == scraper.driver.book.image(index)
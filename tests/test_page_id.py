@@ -0,0 +1,86 @@
+"""
+The page id script run under node against a mocked virtual-scroll list
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from modules.scraper import PAGE_ID_FUNCTION, SEEK_SCRIPT
+
+NODE = shutil.which('node')
+
+# A viewport scrolled so that `first` is the top item of `count` rendered pages,
+# each `height` pixels tall followed by a `margin` pixel gap, after `padding`
+# pixels of leading space. Item positions follow the viewport's scrollTop.
+MOCK_LIST = """
+function mockList(first, count, height, margin, attrs, padding) {
+    var pitch = height + margin;
+    padding = padding || 0;
+    var viewport = {scrollTop: padding + first * pitch, clientHeight: 800,
+                    getBoundingClientRect: function () { return {top: 100}; }};
+    var items = [];
+    var wrapper = {
+        closest: function () { return viewport; },
+        querySelectorAll: function () { return items; },
+        getBoundingClientRect: function () { return {top: 100, height: count * pitch}; }
+    };
+    for (var i = 0; i < count; i++) {
+        (function (page) {
+            items.push({
+                getAttribute: function (name) { return attrs && name === 'data-index' ? String(page) : null; },
+                closest: function () { return wrapper; },
+                getBoundingClientRect: function () {
+                    return {top: 100 + padding + page * pitch - viewport.scrollTop, height: height};
+                }
+            });
+        })(first + i);
+    }
+    items.forEach(function (item, i) {
+        item.nextElementSibling = items[i + 1] || null;
+        item.previousElementSibling = items[i - 1] || null;
+    });
+    global.document = {querySelector: function () { return wrapper; }};
+    return {viewport: viewport, items: items, pitch: pitch, padding: padding};
+}
+"""
+
+
+def run_node(script):
+    """Run a script under node and return the JSON it prints"""
+    output = subprocess.run([NODE, '-e', script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def page_ids(*args):
+    """Return the page ids computed for every item of a mocked list"""
+    return run_node(PAGE_ID_FUNCTION + MOCK_LIST +
+                    f"console.log(JSON.stringify(mockList({', '.join(map(json.dumps, args))}).items.map(gbcPageId)));")
+
+
+def seek_top(page, *args):
+    """Seek a mocked list to a page and return the page whose top is then at the top of the viewport"""
+    return run_node(MOCK_LIST + f"var list = mockList({', '.join(map(json.dumps, args))});" +
+                    f"new Function({json.dumps(SEEK_SCRIPT)}).call(null, {page});" +
+                    "console.log(JSON.stringify((list.viewport.scrollTop - list.padding) / list.pitch));")
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+@pytest.mark.parametrize('count', [1, 6])
+def test_offset_fallback_counts_the_margin_between_pages(count):
+    # Dividing by the item height alone would put page 200 at 208
+    assert page_ids(200, count, 1000, 40, False) == list(range(200, 200 + count))
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+def test_position_attribute_wins():
+    assert page_ids(7, 3, 1000, 40, True) == [7, 8, 9]
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+@pytest.mark.parametrize('attrs', [False, True])
+def test_seek_uses_the_same_pitch_as_page_ids(attrs):
+    # Scrolling by the item height alone would put page 192 at the top
+    assert seek_top(200, 3, 6, 1000, 40, attrs, 24) == 200
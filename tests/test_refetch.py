@@ -0,0 +1,45 @@
+"""
+Targeted refetch of missing pages through the recorded reader page ids
+"""
+
+import os
+
+import pytest
+
+from conftest import page_files
+from bench.fake_driver import SyntheticBook
+
+
+@pytest.mark.parametrize('download_mode', ['bytes', 'browser'])
+def test_refetch_restores_gaps_of_a_discovery_crawl(make_scraper, download_mode):
+    # A resumed GUI crawl: file index = reader page + 5
+    first = make_scraper(SyntheticBook(20, 8, 0.0, session='first'), force_startnum=5)
+    first.driver.broken_pages = {12}
+    first.start_scraping()
+    os.remove(os.path.join(first.download_path, '8.png'))
+    with open(os.path.join(first.download_path, '10.png'), 'wb') as f:
+        f.write(b'\x89PNG partial')  # An unconfirmed download cut short
+    assert 8 not in page_files(first.download_path) and 17 not in page_files(first.download_path)
+
+    second = make_scraper(SyntheticBook(20, 8, 0.0, session='second'), download_mode=download_mode)
+    assert second.refetch_pages([8, 10, 17, 100], timeout_per_page=2) == [100]
+    assert second.naming_mode == 'discovery'
+    assert sorted(os.listdir(second.download_path)) == sorted([f"{index}.png" for index in range(5, 25)] +
+                                                              ['manifest.jsonl'])
+    for index, page in ((8, 3), (10, 5), (17, 12)):
+        with open(os.path.join(second.download_path, f"{index}.png"), 'rb') as f:
+            assert f.read() == second.driver.book.image(page)
+
+
+def test_refetch_corrects_a_seek_that_lands_short(make_scraper):
+    book = SyntheticBook(40, 8, 0.0)
+    first = make_scraper(book)
+    first.start_scraping()
+    os.remove(os.path.join(first.download_path, '30.png'))
+
+    # Tall pages near the start make a pitch measured there undershoot page 30
+    book = SyntheticBook(40, 8, 0.0, session='second')
+    book.heights = {page: 6000 for page in range(1, 6)}
+    second = make_scraper(book)
+    assert second.refetch_pages([30], timeout_per_page=3) == []
+    assert 30 in page_files(second.download_path)
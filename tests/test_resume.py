@@ -0,0 +1,35 @@
+"""
+Resuming a crawl from the manifest in a new reader session
+"""
+
+from conftest import page_files
+from bench.fake_driver import SyntheticBook
+
+
+def crawl(scraper):
+    """Run a crawl to the end and return the indexes it saved"""
+    saved = []
+    scraper.start_scraping(lambda images: saved.extend(index for src, index in images))
+    return sorted(saved)
+
+
+def test_resume_skips_pages_saved_in_an_earlier_session(make_scraper):
+    first = make_scraper(SyntheticBook(20, 8, 0.0, session='first'))
+    first.driver.broken_pages = {5}
+    assert crawl(first) == [index for index in range(20) if index != 5]
+
+    # Blob URLs differ in the new session, so pages must be matched by reader page id
+    second = make_scraper(SyntheticBook(20, 8, 0.0, session='second'))
+    assert crawl(second) == [5]
+    assert page_files(second.download_path) == list(range(20))
+
+
+def test_resume_ignores_another_books_manifest(make_scraper):
+    first = make_scraper()
+    crawl(first)
+
+    other = make_scraper(force_startnum=3)
+    other.driver.current_url = 'https://play.google.com/books/reader?id=other'
+    assert other.load_manifest() == 0
+    assert other.current_index == 0
+    assert not other.seen_pages
@@ -0,0 +1,27 @@
+"""
+Sharded crawls of one synthetic book merged by reader page id
+"""
+
+from conftest import page_files
+from modules.scraper import GoogleBooksScraper
+from modules.shard_coordinator import ShardCoordinator
+from bench.fake_driver import FakeDriver, SyntheticBook
+
+
+def test_shards_split_the_book_without_overlap(tmp_path, monkeypatch):
+    def init_driver(scraper, **options):
+        book = SyntheticBook(40, 8, 0.0)
+        book.heights = {page: 3000 for page in range(1, 4)}  # Makes the first seek land early
+        scraper.driver = FakeDriver(book, scraper.download_path)
+        return True
+
+    monkeypatch.setattr(GoogleBooksScraper, 'init_driver', init_driver)
+    options = {'discovery_mode': 'observe', 'download_mode': 'bytes', 'observe_timeout': 0.2,
+               'use_rate_governor': False}
+    coordinator = ShardCoordinator('https://play.google.com/books/reader?id=fake', str(tmp_path / 'book'), 40,
+                                   profile_dir=str(tmp_path / 'profile'), scraper_options=options, idle_timeout=1)
+    coordinator.launch()
+    coordinator.run()
+
+    assert coordinator.merge() == (40, 0)
+    assert page_files(coordinator.download_path) == list(range(40))